@@ -1,8 +1,8 @@
 import platform
-import struct
 import sys
 import os
 import ctypes as ct
+import numpy as np
 from .vrepConst import *
 
 #load library
@@ -277,20 +277,32 @@ def simxGetVisionSensorImage(clientID, sensorHandle, options, operationMode):
     reso = []
     image = []
     if (ret == 0):
-        image = [None]*resolution[0]*resolution[1]*bytesPerPixel
-        for i in range(resolution[0] * resolution[1] * bytesPerPixel):
-            image[i] = c_image[i]
-        for i in range(2):
-            reso.append(resolution[i])
+        image = np.ctypeslib.as_array(c_image, (resolution[0] * resolution[1] * bytesPerPixel,)).tolist()
+        reso = list(resolution)
     return ret, reso, image
 
+def simxGetVisionSensorImageArray(clientID, sensorHandle, options, operationMode):
+    '''
+    Same as simxGetVisionSensorImage, but image comes as (height, width, bytesPerPixel) uint8
+    array copied from C buffer at once, the C buffer is reused by next call of the library
+    '''
+
+    resolution = (ct.c_int*2)()
+    c_image  = ct.POINTER(ct.c_byte)()
+    bytesPerPixel = 1 if (options & 1) != 0 else 3
+    ret = c_GetVisionSensorImage(clientID, sensorHandle, resolution, ct.byref(c_image), options, operationMode)
+
+    if ret != 0:
+        return ret, [], np.zeros((0, 0, bytesPerPixel), dtype=np.uint8)
+    image = np.ctypeslib.as_array(c_image, (resolution[1], resolution[0], bytesPerPixel)).view(np.uint8).copy()
+    return ret, list(resolution), image
+
 def simxSetVisionSensorImage(clientID, sensorHandle, image, options, operationMode):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
-    size = len(image)
-    image_bytes  = (ct.c_byte*size)(*image)
-    return c_SetVisionSensorImage(clientID, sensorHandle, image_bytes, size, options, operationMode)
+    image_bytes = np.ascontiguousarray(np.asarray(image).astype(np.int8, copy=False).reshape(-1))
+    return c_SetVisionSensorImage(clientID, sensorHandle, image_bytes.ctypes.data_as(ct.POINTER(ct.c_byte)), image_bytes.size, options, operationMode)
 
 def simxGetVisionSensorDepthBuffer(clientID, sensorHandle, operationMode):
     '''
@@ -302,13 +314,23 @@ def simxGetVisionSensorDepthBuffer(clientID, sensorHandle, operationMode):
     reso = []
     buffer = []
     if (ret == 0):
-        buffer = [None]*resolution[0]*resolution[1]
-        for i in range(resolution[0] * resolution[1]):
-            buffer[i] = c_buffer[i]
-        for i in range(2):
-            reso.append(resolution[i])
+        buffer = np.ctypeslib.as_array(c_buffer, (resolution[0] * resolution[1],)).tolist()
+        reso = list(resolution)
     return ret, reso, buffer
 
+def simxGetVisionSensorDepthBufferArray(clientID, sensorHandle, operationMode):
+    '''
+    Same as simxGetVisionSensorDepthBuffer, but buffer comes as (height, width) float32 array
+    copied from C buffer at once
+    '''
+    c_buffer  = ct.POINTER(ct.c_float)()
+    resolution = (ct.c_int*2)()
+    ret = c_GetVisionSensorDepthBuffer(clientID, sensorHandle, resolution, ct.byref(c_buffer), operationMode)
+    if ret != 0:
+        return ret, [], np.zeros((0, 0), dtype=np.float32)
+    buffer = np.ctypeslib.as_array(c_buffer, (resolution[1], resolution[0])).copy()
+    return ret, list(resolution), buffer
+
 def simxGetObjectChild(clientID, parentObjectHandle, childIndex, operationMode):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
@@ -342,6 +364,78 @@ def simxReadProximitySensor(clientID, sensorHandle, operationMode):
         arr2.append(detectedSurfaceNormalVector[i])
     return ret, bool(detectionState.value!=0), arr1, detectedObjectHandle.value, arr2
 
+class ProximitySensorReader:
+    '''
+    Reads several proximity sensors into buffers allocated once. Detected points are written
+    straight into rows of an (n, 3) float32 array, detection states into a mask and return codes
+    into an int array, so repeated reads allocate nothing.
+    '''
+
+    PROXIMITY_SENSOR_DATA = 13
+
+    def __init__(self, clientID, sensorHandles, grouped=False):
+        self.clientID = clientID
+        self.grouped = grouped
+        self.sensorHandles = list(sensorHandles)
+        self.points = np.zeros((len(self.sensorHandles), 3), dtype=np.float32)
+        self.detected = np.zeros(len(self.sensorHandles), dtype=bool)
+        self.returnCodes = np.zeros(len(self.sensorHandles), dtype=np.int32)
+
+        self._detectionState = ct.c_ubyte()
+        self._detectedObjectHandle = ct.c_int()
+        self._detectedSurfaceNormalVector = (ct.c_float*3)()
+        self._calls = [
+            (handle, self.points[i].ctypes.data_as(ct.POINTER(ct.c_float)))
+            for i, handle in enumerate(self.sensorHandles)
+        ]
+
+        # out-parameters of grouped read, and positions of our sensors in its reply
+        self._groupCounts = [ct.c_int() for _ in range(4)]
+        self._groupPointers = [ct.POINTER(ct.c_int)(), ct.POINTER(ct.c_int)(), ct.POINTER(ct.c_float)(), ct.POINTER(ct.c_char)()]
+        self._groupArgs = [ct.byref(x) for pair in zip(self._groupCounts, self._groupPointers) for x in pair]
+        self._groupHandles = None
+        self._groupIndices = None
+
+    def read(self, operationMode):
+        if self.grouped:
+            return self.readGroup(operationMode)
+
+        detectionState = ct.byref(self._detectionState)
+        detectedObjectHandle = ct.byref(self._detectedObjectHandle)
+        for i, (handle, detectedPoint) in enumerate(self._calls):
+            self.returnCodes[i] = c_ReadProximitySensor(self.clientID, handle, detectionState, detectedPoint, detectedObjectHandle, self._detectedSurfaceNormalVector, operationMode)
+            self.detected[i] = self._detectionState.value != 0
+        return self.returnCodes, self.detected, self.points
+
+    def readGroup(self, operationMode):
+        '''
+        Same as read, but data of all proximity sensors of the scene come in one reply of
+        simxGetObjectGroupData and are decoded from its buffers without per item copies.
+        '''
+        ret = c_GetObjectGroupData(self.clientID, sim_object_proximitysensor_type, self.PROXIMITY_SENSOR_DATA, *self._groupArgs, operationMode)
+        handlesC, intDataC, floatDataC, _ = (count.value for count in self._groupCounts)
+        if ret != simx_return_ok or handlesC == 0:
+            self.returnCodes.fill(ret if ret != simx_return_ok else simx_return_novalue_flag)
+            return self.returnCodes, self.detected, self.points
+
+        handlesP, intDataP, floatDataP, _ = self._groupPointers
+        handles = np.ctypeslib.as_array(handlesP, (handlesC,))
+        if self._groupHandles is None or not np.array_equal(handles, self._groupHandles):
+            self._groupHandles = handles.copy()
+            positions = {handle: i for i, handle in enumerate(self._groupHandles.tolist())}
+            self._groupIndices = np.array([positions.get(handle, -1) for handle in self.sensorHandles])
+
+        # 2 ints per sensor: detection state and detected object, 6 floats: point and normal
+        found = self._groupIndices >= 0
+        indices = self._groupIndices[found]
+        intData = np.ctypeslib.as_array(intDataP, (intDataC,)).reshape(-1, 2)
+        floatData = np.ctypeslib.as_array(floatDataP, (floatDataC,)).reshape(-1, 6)
+        self.returnCodes[found] = simx_return_ok
+        self.returnCodes[~found] = simx_return_novalue_flag
+        self.detected[found] = intData[indices, 0] != 0
+        self.points[found] = floatData[indices, :3]
+        return self.returnCodes, self.detected, self.points
+
 def simxLoadModel(clientID, modelPathAndName, options, operationMode):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
@@ -1432,47 +1526,76 @@ def simxPackInts(intList):
     Please have a look at the function description/documentation in the V-REP user manual
     '''
 
-    if sys.version_info[0] == 3:
-        s=bytes()
-        for i in range(len(intList)):
-            s=s+struct.pack('<i',intList[i])
-        s=bytearray(s)
-    else:
-        s=''
-        for i in range(len(intList)):
-            s+=struct.pack('<i',intList[i])
-    return s
+    return bytearray(simxPackIntsArray(intList))
 
 def simxUnpackInts(intsPackedInString):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
-    b=[]
-    for i in range(int(len(intsPackedInString)/4)):
-        b.append(struct.unpack('<i',intsPackedInString[4*i:4*(i+1)])[0])
-    return b
+    return simxUnpackIntsArray(intsPackedInString).tolist()
 
 def simxPackFloats(floatList):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
 
-    if sys.version_info[0] == 3:
-        s=bytes()
-        for i in range(len(floatList)):
-            s=s+struct.pack('<f',floatList[i])
-        s=bytearray(s)
-    else:
-        s=''
-        for i in range(len(floatList)):
-            s+=struct.pack('<f',floatList[i])
-    return s
+    return bytearray(simxPackFloatsArray(floatList))
 
 def simxUnpackFloats(floatsPackedInString):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
-    b=[]
-    for i in range(int(len(floatsPackedInString)/4)):
-        b.append(struct.unpack('<f',floatsPackedInString[4*i:4*(i+1)])[0])
-    return b
+    return simxUnpackFloatsArray(floatsPackedInString).tolist()
+
+def simxPackIntsArray(ints):
+    '''
+    Little endian int32 packing of any sequence or array in one conversion, returns numpy
+    array which exposes the packed bytes through buffer protocol. Like struct packing,
+    non-integral values and values out of int32 range are rejected, not truncated
+    '''
+    array = np.asarray(ints)
+    if array.size == 0:
+        return np.ascontiguousarray(array, dtype='<i4')
+    if array.dtype.kind not in 'biu':
+        raise TypeError('packed ints must be integers, got %s' % array.dtype)
+    if array.min() < -2**31 or array.max() >= 2**31:
+        raise ValueError('packed ints must fit in int32')
+    return np.ascontiguousarray(array, dtype='<i4')
+
+def simxUnpackIntsArray(intsPacked):
+    '''
+    Read-only numpy view of packed int32 values, the buffer is not copied
+    '''
+    return _unpackArray(intsPacked, '<i4')
+
+def simxPackFloatsArray(floats):
+    '''
+    Little endian float32 packing of any sequence or array in one conversion. Like struct
+    packing, non-numeric values are rejected and finite values too large for float32
+    raise OverflowError instead of becoming infinite
+    '''
+    array = np.asarray(floats)
+    if array.size == 0:
+        return np.ascontiguousarray(array, dtype='<f4')
+    if array.dtype.kind not in 'biuf':
+        raise TypeError('packed floats must be numbers, got %s' % array.dtype)
+    with np.errstate(over='ignore'):
+        packed = np.ascontiguousarray(array, dtype='<f4')
+    if array.dtype.kind == 'f' and np.any(np.isinf(packed) & np.isfinite(array)):
+        raise OverflowError('packed floats must fit in float32')
+    return packed
+
+def simxUnpackFloatsArray(floatsPacked):
+    '''
+    Read-only numpy view of packed float32 values, the buffer is not copied
+    '''
+    return _unpackArray(floatsPacked, '<f4')
+
+def _unpackArray(packed, dtype):
+    if isinstance(packed, str):
+        packed = packed.encode('latin-1')
+    view = memoryview(packed).cast('B')
+    count = len(view) // 4
+    array = np.frombuffer(view, dtype=dtype, count=count)
+    array.flags.writeable = False
+    return array
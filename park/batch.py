@@ -0,0 +1,88 @@
+import numpy as np
+
+# elements of aggregate of one chunk, samples times consequent universe points, so that
+# fine universes are evaluated in proportionally smaller chunks
+CHUNK_ELEMENTS = 2 ** 20
+
+
+def evaluate(ctrl_system, chunk_size=None, **inputs):
+    # same Mamdani inference as ControlSystemSimulation.compute, but for whole arrays of
+    # inputs in one pass; centroid is taken over consequent universe without inserting
+    # cut points, so results differ from skfuzzy by less than universe resolution,
+    # NaN is returned where no rule fired
+    inputs = {label: np.asarray(value, dtype=float) for label, value in inputs.items()}
+    shape = np.broadcast_shapes(*(value.shape for value in inputs.values()))
+    inputs = {label: np.broadcast_to(value, shape).ravel() for label, value in inputs.items()}
+
+    size = int(np.prod(shape))
+    if chunk_size is None:
+        points = max(len(consequent.universe) for consequent in ctrl_system.consequents)
+        chunk_size = max(CHUNK_ELEMENTS // points, 1)
+    outputs = {consequent.label: np.empty(size) for consequent in ctrl_system.consequents}
+
+    for start in range(0, size, chunk_size):
+        chunk = {label: value[start:start + chunk_size] for label, value in inputs.items()}
+        for label, value in _evaluate_chunk(ctrl_system, chunk).items():
+            outputs[label][start:start + chunk_size] = value
+
+    return {label: value.reshape(shape) for label, value in outputs.items()}
+
+
+def _evaluate_chunk(ctrl_system, inputs):
+    memberships = {}
+    for antecedent in ctrl_system.antecedents:
+        if antecedent.label not in inputs:
+            raise ValueError(f'missing input for antecedent {antecedent.label}')
+        value = inputs[antecedent.label]
+        for term in antecedent.terms.values():
+            memberships[term] = np.interp(value, antecedent.universe, term.mf)
+
+    cuts = {}
+    for rule in ctrl_system.rules:
+        firing = _firing(rule.antecedent, memberships, rule.and_func, rule.or_func)
+        for weighted in rule.consequent:
+            term = weighted.term
+            activation = firing * weighted.weight
+            if term in cuts:
+                activation = term.parent.accumulation_method(activation, cuts[term])
+            cuts[term] = activation
+
+    outputs = {}
+    for consequent in ctrl_system.consequents:
+        universe = consequent.universe
+        aggregate = np.zeros((len(next(iter(inputs.values()))), len(universe)))
+        for term in consequent.terms.values():
+            if term in cuts:
+                np.maximum(aggregate, np.minimum(cuts[term][:, None], term.mf[None, :]), out=aggregate)
+        outputs[consequent.label] = _centroid(universe, aggregate)
+
+    return outputs
+
+
+def _firing(antecedent, memberships, and_func, or_func):
+    from skfuzzy.control.term import Term
+
+    if isinstance(antecedent, Term):
+        return memberships[antecedent]
+
+    first = _firing(antecedent.term1, memberships, and_func, or_func)
+    if antecedent.kind == 'not':
+        return 1 - first
+
+    second = _firing(antecedent.term2, memberships, and_func, or_func)
+    if antecedent.kind == 'and':
+        return and_func(first, second)
+    return or_func(first, second)
+
+
+def _centroid(x, mfx):
+    # exact area and moment of piecewise linear membership between universe samples
+    x1, x2 = x[:-1], x[1:]
+    y1, y2 = mfx[:, :-1], mfx[:, 1:]
+    dx = x2 - x1
+
+    area = np.sum(dx * (y1 + y2), axis=1) / 2
+    moment = np.sum(dx * (y1 * (2 * x1 + x2) + y2 * (x1 + 2 * x2)), axis=1) / 6
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(area > 0, moment / area, np.nan)
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .surface import Surface
+
+CACHE_DIR = os.environ.get('FUZZY_PARK_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'fuzzy-park'))
+
+
+def load(key):
+    path = os.path.join(CACHE_DIR, key)
+    try:
+        with open(os.path.join(path, 'axes.json')) as file:
+            labels = json.load(file)
+        axes = {label: np.load(os.path.join(path, f'axis_{i}.npy')) for i, label in enumerate(labels)}
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    return Surface(axes, values)
+
+
+def save(key, surface):
+    # write into temporary directory and rename, so concurrent workers never see partial entries
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = tempfile.mkdtemp(dir=CACHE_DIR)
+    except OSError:
+        return
+
+    try:
+        axes = surface.axes()
+        with open(os.path.join(path, 'axes.json'), 'w') as file:
+            json.dump(list(axes), file)
+        for i, knots in enumerate(axes.values()):
+            np.save(os.path.join(path, f'axis_{i}.npy'), knots)
+        np.save(os.path.join(path, 'values.npy'), surface.values)
+        os.rename(path, os.path.join(CACHE_DIR, key))
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def compiled(key, build):
+    surface = load(key)
+    if surface is None:
+        surface = build()
+        save(key, surface)
+    return surface
+
+
+def chosen(key, choose):
+    # small json entries next to surfaces, like engine picked for rule base
+    path = os.path.join(CACHE_DIR, f'{key}.json')
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        pass
+
+    choice = choose()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=CACHE_DIR)
+    except OSError:
+        return choice
+
+    try:
+        with os.fdopen(handle, 'w') as file:
+            json.dump(choice, file)
+        os.rename(temporary, path)
+    except OSError:
+        os.remove(temporary)
+    return choice
@@ -0,0 +1,146 @@
+import numpy as np
+
+from .system import Term
+
+
+class ExactEngine:
+
+    # Mamdani inference with min implication, max accumulation and centroid
+    # defuzzification computed in closed form from breakpoints of trimf/trapmf sets.
+    # Aggregated output is piecewise linear with kinks only at set breakpoints, at
+    # points where a set reaches cut level of any term and at crossings of sloped
+    # set edges, so it is integrated exactly segment by segment between them
+
+    def __init__(self, rule_base):
+        self._inputs = {variable.label: variable for variable in rule_base.inputs}
+        self._rules = [(rule.antecedent, rule.consequent.label) for rule in rule_base.rules]
+
+        output = rule_base.output
+        self._low, self._high = output.low, output.high
+        self._labels = list(output.terms)
+        shapes = output.terms.values()
+        self._a = np.array([s.a for s in shapes])
+        self._b = np.array([s.b for s in shapes])
+        self._c = np.array([s.c for s in shapes])
+        self._d = np.array([s.d for s in shapes])
+
+        self._fixed = np.concatenate([self._a, self._b, self._c, self._d, self._edge_crossings(),
+                                      [self._low, self._high]])
+        self._fixed = np.unique(np.clip(self._fixed, self._low, self._high))
+
+    def context(self):
+        return self
+
+    def axes(self):
+        axes = {}
+        for label, variable in self._inputs.items():
+            knots = [variable.low, variable.high]
+            for shape in variable.terms.values():
+                knots.extend([shape.a, shape.b, shape.c, shape.d])
+            axes[label] = np.unique(np.clip(knots, variable.low, variable.high))
+        return axes
+
+    def compute(self, **inputs):
+        velocity = float(self.compute_batch(**inputs))
+        if np.isnan(velocity):
+            raise ValueError('no rule fired, output membership is empty')
+        return velocity
+
+    def compute_batch(self, **inputs):
+        missing = set(self._inputs) - set(inputs)
+        if missing:
+            raise ValueError(f'missing input for antecedents {", ".join(sorted(missing))}')
+
+        memberships = {}
+        for label, value in inputs.items():
+            variable = self._inputs[label]
+            value = np.clip(np.asarray(value, dtype=float), variable.low, variable.high)
+            for term, shape in variable.terms.items():
+                memberships[label, term] = _membership(value, shape.a, shape.b, shape.c, shape.d)
+
+        shape = np.broadcast_shapes(*(value.shape for value in memberships.values()))
+        cuts = np.zeros(shape + (len(self._labels),))
+        if cuts.size == 0:
+            return np.empty(shape)
+        for antecedent, label in self._rules:
+            index = self._labels.index(label)
+            np.maximum(cuts[..., index], _firing(antecedent, memberships), out=cuts[..., index])
+
+        return self._centroid(cuts.reshape(-1, len(self._labels))).reshape(shape)
+
+    def _centroid(self, cuts):
+        # points where rising and falling edges of every set reach every cut level
+        h = cuts[:, None, :]
+        a, b, c, d = (p[None, :, None] for p in (self._a, self._b, self._c, self._d))
+        rising = np.where(b > a, a + h * (b - a), a)
+        falling = np.where(d > c, d - h * (d - c), d)
+
+        x = np.concatenate([
+            np.broadcast_to(self._fixed, (len(cuts), len(self._fixed))),
+            rising.reshape(len(cuts), -1),
+            falling.reshape(len(cuts), -1),
+        ], axis=1)
+        x = np.sort(np.clip(x, self._low, self._high), axis=1)
+
+        # aggregate is linear inside every segment but may jump at vertical set edges,
+        # so it is sampled at two interior points of each segment
+        x0, x1 = x[:, :-1], x[:, 1:]
+        width = x1 - x0
+        u = self._aggregate(x0 + width / 3, cuts)
+        v = self._aggregate(x0 + 2 * width / 3, cuts)
+        y0 = 2 * u - v
+        y1 = 2 * v - u
+
+        area = np.sum(width * (u + v), axis=1) / 2
+        moment = np.sum(width * (y0 * (2 * x0 + x1) + y1 * (x0 + 2 * x1)), axis=1) / 6
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(area > 0, moment / area, np.nan)
+
+    def _aggregate(self, x, cuts):
+        mf = _membership(x[..., None], self._a, self._b, self._c, self._d)
+        return np.max(np.minimum(mf, cuts[:, None, :]), axis=-1)
+
+    def _edge_crossings(self):
+        # crossings of sloped edges of different sets, as lines x -> slope * x + offset
+        lines = []
+        for a, b, c, d in zip(self._a, self._b, self._c, self._d):
+            edges = []
+            if b > a:
+                edges.append((1 / (b - a), -a / (b - a), a, b))
+            if d > c:
+                edges.append((-1 / (d - c), d / (d - c), c, d))
+            lines.append(edges)
+
+        crossings = []
+        for i, first in enumerate(lines):
+            for second in lines[i + 1:]:
+                for s1, o1, l1, h1 in first:
+                    for s2, o2, l2, h2 in second:
+                        if s1 == s2:
+                            continue
+                        x = (o2 - o1) / (s1 - s2)
+                        if max(l1, l2) <= x <= min(h1, h2):
+                            crossings.append(x)
+        return crossings
+
+
+def _membership(x, a, b, c, d):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rise = np.where(b > a, (x - a) / np.where(b > a, b - a, 1), x >= a)
+        fall = np.where(d > c, (d - x) / np.where(d > c, d - c, 1), x <= d)
+    return np.clip(np.minimum(rise, fall), 0, 1)
+
+
+def _firing(predicate, memberships):
+    if isinstance(predicate, Term):
+        return memberships[predicate.variable.label, predicate.label]
+
+    first = _firing(predicate.first, memberships)
+    if predicate.kind == 'not':
+        return 1 - first
+
+    second = _firing(predicate.second, memberships)
+    if predicate.kind == 'and':
+        return np.fmin(first, second)
+    return np.fmax(first, second)
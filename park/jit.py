@@ -0,0 +1,175 @@
+import numpy as np
+
+from .exact import ExactEngine
+from .system import Term
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+AND, OR, NOT, END = -1, -2, -3, -4
+
+
+class JitEngine(ExactEngine):
+
+    # Same closed-form inference as ExactEngine, but whole evaluation of every sample
+    # runs in one loop compiled by numba. Rules are flattened into postfix programs of
+    # term indices and operators. Without numba falls back to vectorized numpy path
+
+    def __init__(self, rule_base):
+        super().__init__(rule_base)
+
+        self._order = list(self._inputs)
+        terms = [(i, label, shape) for i, variable in enumerate(self._inputs.values())
+                 for label, shape in variable.terms.items()]
+        index = {(self._order[i], label): n for n, (i, label, _) in enumerate(terms)}
+
+        self._term_input = np.array([i for i, _, _ in terms], dtype=np.int64)
+        self._term_params = np.array([[s.a, s.b, s.c, s.d] for _, _, s in terms])
+        self._bounds = np.array([[v.low, v.high] for v in self._inputs.values()], dtype=float)
+
+        program = []
+        for antecedent, label in self._rules:
+            program.extend(_flatten(antecedent, index))
+            program.extend([END, self._labels.index(label)])
+        self._program = np.array(program, dtype=np.int64)
+        self._output_params = np.stack([self._a, self._b, self._c, self._d], axis=1)
+
+        # kernel is compiled, or loaded from numba cache, now rather than on first tick
+        if numba is not None:
+            self._run(np.zeros((1, len(self._order))))
+
+    def compute(self, **inputs):
+        if numba is None:
+            return super().compute(**inputs)
+
+        samples = np.array([[inputs[label] for label in self._order]], dtype=float)
+        velocity = self._run(samples)[0]
+        if np.isnan(velocity):
+            raise ValueError('no rule fired, output membership is empty')
+        return float(velocity)
+
+    def compute_batch(self, **inputs):
+        if numba is None:
+            return super().compute_batch(**inputs)
+
+        missing = set(self._inputs) - set(inputs)
+        if missing:
+            raise ValueError(f'missing input for antecedents {", ".join(sorted(missing))}')
+
+        values = [np.asarray(inputs[label], dtype=float) for label in self._order]
+        shape = np.broadcast_shapes(*(value.shape for value in values))
+        samples = np.stack([np.broadcast_to(value, shape).ravel() for value in values], axis=1)
+
+        return self._run(samples).reshape(shape)
+
+    def _run(self, samples):
+        return _kernel(samples, self._bounds, self._term_input, self._term_params, self._program,
+                       self._output_params, self._fixed, self._low, self._high)
+
+
+def _flatten(predicate, index):
+    if isinstance(predicate, Term):
+        return [index[predicate.variable.label, predicate.label]]
+    if predicate.kind == 'not':
+        return _flatten(predicate.first, index) + [NOT]
+    operator = AND if predicate.kind == 'and' else OR
+    return _flatten(predicate.first, index) + _flatten(predicate.second, index) + [operator]
+
+
+def _trapezoid(x, a, b, c, d):
+    if b > a:
+        rise = (x - a) / (b - a)
+    else:
+        rise = 1.0 if x >= a else 0.0
+    if d > c:
+        fall = (d - x) / (d - c)
+    else:
+        fall = 1.0 if x <= d else 0.0
+    return min(max(min(rise, fall), 0.0), 1.0)
+
+
+def _aggregate(x, cuts, params):
+    value = 0.0
+    for t in range(len(cuts)):
+        value = max(value, min(cuts[t], _trapezoid(x, params[t, 0], params[t, 1], params[t, 2], params[t, 3])))
+    return value
+
+
+def _kernel(samples, bounds, term_input, term_params, program, output_params, fixed, low, high):
+    count = len(output_params)
+    result = np.empty(len(samples))
+    memberships = np.empty(len(term_input))
+    cuts = np.empty(count)
+    stack = np.empty(len(program))
+    points = np.empty(len(fixed) + 2 * count * count)
+
+    for n in range(len(samples)):
+        for m in range(len(term_input)):
+            i = term_input[m]
+            x = min(max(samples[n, i], bounds[i, 0]), bounds[i, 1])
+            memberships[m] = _trapezoid(x, term_params[m, 0], term_params[m, 1], term_params[m, 2], term_params[m, 3])
+
+        # rule firing with postfix programs, END pops firing strength into consequent cut
+        cuts[:] = 0.0
+        top = 0
+        p = 0
+        while p < len(program):
+            op = program[p]
+            if op >= 0:
+                stack[top] = memberships[op]
+                top += 1
+            elif op == NOT:
+                stack[top - 1] = 1.0 - stack[top - 1]
+            elif op == END:
+                p += 1
+                top -= 1
+                cuts[program[p]] = max(cuts[program[p]], stack[top])
+            else:
+                top -= 1
+                if op == AND:
+                    stack[top - 1] = min(stack[top - 1], stack[top])
+                else:
+                    stack[top - 1] = max(stack[top - 1], stack[top])
+            p += 1
+
+        # kinks of aggregate, see ExactEngine
+        k = 0
+        for x in fixed:
+            points[k] = x
+            k += 1
+        for t in range(count):
+            a, b, c, d = output_params[t, 0], output_params[t, 1], output_params[t, 2], output_params[t, 3]
+            for s in range(count):
+                points[k] = a + cuts[s] * (b - a)
+                points[k + 1] = d - cuts[s] * (d - c)
+                k += 2
+        for j in range(k):
+            points[j] = min(max(points[j], low), high)
+        points.sort()
+
+        area = 0.0
+        moment = 0.0
+        for j in range(k - 1):
+            x0 = points[j]
+            x1 = points[j + 1]
+            width = x1 - x0
+            if width <= 0:
+                continue
+            u = _aggregate(x0 + width / 3, cuts, output_params)
+            v = _aggregate(x0 + 2 * width / 3, cuts, output_params)
+            y0 = 2 * u - v
+            y1 = 2 * v - u
+            area += width * (u + v) / 2
+            moment += width * (y0 * (2 * x0 + x1) + y1 * (x0 + 2 * x1)) / 6
+
+        result[n] = moment / area if area > 0 else np.nan
+
+    return result
+
+
+if numba is not None:
+    _trapezoid = numba.njit(cache=True)(_trapezoid)
+    _aggregate = numba.njit(cache=True)(_aggregate)
+    _kernel = numba.njit(cache=True)(_kernel)
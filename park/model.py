@@ -1,15 +1,20 @@
-import matplotlib.pyplot as plt
+import copy
+
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-from skfuzzy.control import Antecedent, Consequent, Rule
+
+from utils.history import RingBuffer
+from .system import Input, Output, Rule, RuleBase, trapmf, trimf
 
 
 class FuzzyModel:
 
     MAX_DIST = 6
 
+    # universe samples of skfuzzy engine without accuracy, as models were tuned with
+    POINTS = 600
+
     def __init__(self, max_vel, stop_dist, break_dist, break_vel, sharpness, *,
+                 engine=None, accuracy=None, compiled=False, max_error=1e-3, history=10000,
                  plot_sets=False, plot_history=False):
         self._max_vel = max_vel
         self._stop_dist = stop_dist
@@ -19,26 +24,47 @@ class FuzzyModel:
 
         self._plot_sets = plot_sets
         self._plot_history = plot_history
-        self._dist_hist = []
-        self._vel_hist = []
+        self._history = RingBuffer(history, ['dist', 'vel'])
+
+        self.rule_base = self._construct_model()
+        # without engine given, model runs on engine of stages, auto by default
+        if engine is None:
+            self._model = self.rule_base.stage_engine('auto', accuracy=accuracy, compiled=compiled, max_error=max_error)
+        else:
+            self._model = self.rule_base.engine(engine, accuracy=accuracy, compiled=compiled, max_error=max_error)
 
-        self._model = self._construct_model()
+    @property
+    def engine(self):
+        return self._model
 
     def get_velocity(self, distance):
-        self._dist_hist.append(distance)
         velocity = self._get_velocity(distance)
-        self._vel_hist.append(velocity)
+        self._history.append(distance, velocity)
         if velocity == 0 and self._plot_history:
             self._plot_history_data()
         return velocity
 
+    def context(self):
+        # shares configuration and compiled engine, but has its own evaluation state
+        model = copy.copy(self)
+        model._model = self._model.context()
+        model._history = RingBuffer(self._history.capacity, ['dist', 'vel'])
+        return model
+
+    def reset(self):
+        self._history.clear()
+
+    def get_velocities(self, distances):
+        distances = np.asarray(distances, dtype=float)
+        velocities = self._model.compute_batch(dist=distances)
+        velocities[(distances < self._stop_dist) | (velocities < 0.05)] = 0
+        return velocities
+
     def _get_velocity(self, distance):
         if distance < self._stop_dist:
             return 0
 
-        self._model.input['dist'] = distance
-        self._model.compute()
-        velocity = self._model.output['vel']
+        velocity = self._model.compute(dist=distance)
 
         if velocity < 0.05:
             return 0
@@ -49,22 +75,17 @@ class FuzzyModel:
         l_span = self._break_vel
         h_span = self._max_vel - self._break_vel
 
-        dist = Antecedent(np.linspace(0, self.MAX_DIST, 600), 'dist')
-        vel = Consequent(np.linspace(-l_span, self._max_vel + h_span, 600), 'vel')
+        dist = Input('dist', 0, self.MAX_DIST, self.POINTS)
+        vel = Output('vel', -l_span, self._max_vel + h_span, self.POINTS)
 
         s = self._sharpness
-        dist['h'] = fuzz.trapmf(dist.universe, [self._break_dist - s, self._break_dist + s, self.MAX_DIST, self.MAX_DIST])
-        dist['m'] = fuzz.trapmf(dist.universe, [self._stop_dist - s, self._stop_dist + s, self._break_dist - s, self._break_dist + s])
-        dist['l'] = fuzz.trapmf(dist.universe, [0, 0, self._stop_dist - s, self._stop_dist + s])
+        dist['h'] = trapmf(self._break_dist - s, self._break_dist + s, self.MAX_DIST, self.MAX_DIST)
+        dist['m'] = trapmf(self._stop_dist - s, self._stop_dist + s, self._break_dist - s, self._break_dist + s)
+        dist['l'] = trapmf(0, 0, self._stop_dist - s, self._stop_dist + s)
 
-        vel['l'] = fuzz.trimf(vel.universe, [-l_span, 0, l_span])
-        vel['m'] = fuzz.trimf(vel.universe, [0, self._break_vel, self._max_vel])
-        vel['h'] = fuzz.trimf(vel.universe, [self._max_vel - h_span, self._max_vel, self._max_vel + h_span])
-
-        if self._plot_sets:
-            dist.view()
-            vel.view()
-            plt.show()
+        vel['l'] = trimf(-l_span, 0, l_span)
+        vel['m'] = trimf(0, self._break_vel, self._max_vel)
+        vel['h'] = trimf(self._max_vel - h_span, self._max_vel, self._max_vel + h_span)
 
         rules = [
             Rule(dist['l'], vel['l']),
@@ -72,19 +93,26 @@ class FuzzyModel:
             Rule(dist['h'], vel['h']),
         ]
 
-        ctrl_system = ctrl.ControlSystem(rules)
-        model = ctrl.ControlSystemSimulation(ctrl_system)
+        rule_base = RuleBase(rules)
 
-        return model
+        if self._plot_sets:
+            import matplotlib.pyplot as plt
+            for variable in rule_base.control_system().fuzzy_variables:
+                variable.view()
+            plt.show()
+
+        return rule_base
 
     def _plot_history_data(self):
+        import matplotlib.pyplot as plt
+
         fig, axs = plt.subplots(2, 1)
 
-        axs[0].plot(self._dist_hist)
+        axs[0].plot(self._history['dist'])
         axs[0].set_title('Distance')
         axs[0].grid()
 
-        axs[1].plot(self._vel_hist)
+        axs[1].plot(self._history['vel'])
         axs[1].set_title('Velocity')
         axs[1].grid()
 
@@ -1,10 +1,8 @@
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-from skfuzzy.control import Antecedent, Consequent, Rule
 
-from utils.control import Controller, Stage
+from utils.control import Controller, Stage, lazy
 from .model import FuzzyModel
+from .system import Input, Output, Rule, RuleBase, trapmf, trimf
 
 
 class ParaParkController(Controller):
@@ -23,7 +21,8 @@ class ParaParkController(Controller):
 
 class ForwardToFindSpace(Stage):
 
-    _model = FuzzyModel(
+    _model = lazy(
+        FuzzyModel,
         max_vel=10,
         break_vel=3,
         stop_dist=3.9,
@@ -41,7 +40,8 @@ class ForwardToFindSpace(Stage):
 
 class DriveCloserFirstTurn(Stage):
 
-    _model = FuzzyModel(
+    _model = lazy(
+        FuzzyModel,
         max_vel=5,
         break_vel=1,
         stop_dist=0.7,
@@ -59,18 +59,19 @@ class DriveCloserFirstTurn(Stage):
 
 class DriveCloserSecondTurn(Stage):
 
-    diff = Antecedent(np.linspace(0, 2, 10000), 'diff')
-    vel = Consequent(np.linspace(-1, 6, 200), 'vel')
+    # universes as the stage was tuned with, used by skfuzzy engine
+    diff = Input('diff', 0, 2, 10000)
+    vel = Output('vel', -1, 6, 200)
 
     adj = 0.1
 
-    diff['l'] = fuzz.trapmf(diff.universe, [0, 0, 0.001, 0.01])
-    diff['m'] = fuzz.trapmf(diff.universe, [0.001, 0.01, 0.09+adj, 0.1+adj])
-    diff['h'] = fuzz.trapmf(diff.universe, [0.09+adj, 0.1+adj, 2, 2])
+    diff['l'] = trapmf(0, 0, 0.001, 0.01)
+    diff['m'] = trapmf(0.001, 0.01, 0.09+adj, 0.1+adj)
+    diff['h'] = trapmf(0.09+adj, 0.1+adj, 2, 2)
 
-    vel['z'] = fuzz.trimf(vel.universe, [-1, 0, 1])
-    vel['m'] = fuzz.trimf(vel.universe, [1, 2, 3])
-    vel['h'] = fuzz.trimf(vel.universe, [4, 5, 6])
+    vel['z'] = trimf(-1, 0, 1)
+    vel['m'] = trimf(1, 2, 3)
+    vel['h'] = trimf(4, 5, 6)
 
     rules = [
         Rule(diff['l'], vel['z']),
@@ -78,19 +79,21 @@ class DriveCloserSecondTurn(Stage):
         Rule(diff['h'], vel['h']),
     ]
 
-    ctrl_system = ctrl.ControlSystem(rules)
-    simulation = ctrl.ControlSystemSimulation(ctrl_system)
+    engine = lazy(RuleBase(rules).stage_engine, 'auto', accuracy=0.01)
 
-    @classmethod
-    def get_velocity(cls, distances):
+    def get_velocity(self, distances):
         diff = abs(distances.es2 - distances.en2)
-        cls.simulation.input['diff'] = diff
-        cls.simulation.compute()
-        velocity = cls.simulation.output['vel']
+        velocity = self.engine.compute(diff=diff)
         if abs(velocity) < 0.1:
             return 0
         return velocity
 
+    @classmethod
+    def get_velocities(cls, diff):
+        velocities = cls.engine.compute_batch(diff=diff)
+        velocities[np.abs(velocities) < 0.1] = 0
+        return velocities
+
     def control(self, tank, distances):
         velocity = self.get_velocity(distances)
         tank.turn_right_circle(velocity)
@@ -100,7 +103,8 @@ class DriveCloserSecondTurn(Stage):
 
 class ParkFirstTurn(Stage):
 
-    _model = FuzzyModel(
+    _model = lazy(
+        FuzzyModel,
         max_vel=5,
         break_vel=3,
         stop_dist=6-3.9,
@@ -116,7 +120,8 @@ class ParkFirstTurn(Stage):
 
 class ParkSecondTurn(Stage):
 
-    _model = FuzzyModel(
+    _model = lazy(
+        FuzzyModel,
         max_vel=5,
         break_vel=1,
         stop_dist=1.15,
@@ -133,20 +138,21 @@ class ParkSecondTurn(Stage):
 
 class LastAdjustment(Stage):
 
-    diff = Antecedent(np.linspace(-2, 2, 200), 'diff')
-    vel = Consequent(np.linspace(-4, 4, 200), 'vel')
+    # universes as the stage was tuned with, used by skfuzzy engine
+    diff = Input('diff', -2, 2, 200)
+    vel = Output('vel', -4, 4, 200)
 
     best = -0.5
     slope = 0.4
     speed = 1.5
 
-    diff['l'] = fuzz.trapmf(diff.universe, [-2, -2, best - slope, best])
-    diff['m'] = fuzz.trimf(diff.universe, [best - slope, best, best + slope])
-    diff['h'] = fuzz.trapmf(diff.universe, [best, best + slope, 2, 2])
+    diff['l'] = trapmf(-2, -2, best - slope, best)
+    diff['m'] = trimf(best - slope, best, best + slope)
+    diff['h'] = trapmf(best, best + slope, 2, 2)
 
-    vel['zero'] = fuzz.trimf(vel.universe, [-1, 0, 1])
-    vel['forward'] = fuzz.trimf(vel.universe, [speed-1, speed, speed+1])
-    vel['backward'] = fuzz.trimf(vel.universe, [-speed-1, -speed, -speed+1])
+    vel['zero'] = trimf(-1, 0, 1)
+    vel['forward'] = trimf(speed-1, speed, speed+1)
+    vel['backward'] = trimf(-speed-1, -speed, -speed+1)
 
     rules = [
         Rule(diff['h'], vel['forward']),
@@ -154,21 +160,23 @@ class LastAdjustment(Stage):
         Rule(diff['m'], vel['zero']),
     ]
 
-    ctrl_system = ctrl.ControlSystem(rules)
-    simulation = ctrl.ControlSystemSimulation(ctrl_system)
+    engine = lazy(RuleBase(rules).stage_engine, 'auto', accuracy=0.01)
 
-    @classmethod
-    def get_velocity(cls, distances):
+    def get_velocity(self, distances):
         front = min(distances.nw2, distances.ne2)
         back = min(distances.sw2, distances.se2)
         diff = front - back
-        cls.simulation.input['diff'] = diff
-        cls.simulation.compute()
-        velocity = cls.simulation.output['vel']
+        velocity = self.engine.compute(diff=diff)
         if abs(velocity) < 0.1:
             return 0
         return velocity
 
+    @classmethod
+    def get_velocities(cls, diff):
+        velocities = cls.engine.compute_batch(diff=diff)
+        velocities[np.abs(velocities) < 0.1] = 0
+        return velocities
+
     def control(self, tank, distances):
         velocity = self.get_velocity(distances)
         tank.forward(velocity)
@@ -1,12 +1,10 @@
 from time import time
 
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-from skfuzzy.control import Antecedent, Consequent, Rule
 
-from utils.control import Controller, Stage
+from utils.control import Controller, Stage, lazy
 from .model import FuzzyModel
+from .system import Input, Output, Rule, RuleBase, trapmf, trimf
 
 
 class PerpParkController(Controller):
@@ -23,7 +21,8 @@ class PerpParkController(Controller):
 
 class ForwardToFindLeftSpace(Stage):
 
-    _model = FuzzyModel(
+    _model = lazy(
+        FuzzyModel,
         max_vel=10,
         break_vel=3,
         stop_dist=1.55,
@@ -39,7 +38,8 @@ class ForwardToFindLeftSpace(Stage):
 
 class BackwardBeforeTurn(Stage):
 
-    _model = FuzzyModel(
+    _model = lazy(
+        FuzzyModel,
         max_vel=4,
         break_vel=2,
         stop_dist=4.23,
@@ -55,19 +55,19 @@ class BackwardBeforeTurn(Stage):
 
 class TurnLeftToPark(Stage):
 
-    dist_min = Antecedent(np.linspace(0, 6, 100), 'dist_min')
-    dist_wn = Antecedent(np.linspace(0, 6, 100), 'dist_wn')
-    vel = Consequent(np.linspace(-1, 7, 100), 'vel')
+    dist_min = Input('dist_min', 0, 6)
+    dist_wn = Input('dist_wn', 0, 6)
+    vel = Output('vel', -1, 7)
 
-    dist_min['l'] = fuzz.trapmf(dist_min.universe, [0, 0, 1.55, 160])
-    dist_min['h'] = fuzz.trapmf(dist_min.universe, [1.55, 1.60, 6, 6])
+    dist_min['l'] = trapmf(0, 0, 1.55, 160)
+    dist_min['h'] = trapmf(1.55, 1.60, 6, 6)
 
-    dist_wn['l'] = fuzz.trapmf(dist_wn.universe, [0, 0, 2, 2.05])
-    dist_wn['h'] = fuzz.trapmf(dist_wn.universe, [2, 2.05, 6, 6])
+    dist_wn['l'] = trapmf(0, 0, 2, 2.05)
+    dist_wn['h'] = trapmf(2, 2.05, 6, 6)
 
-    vel['z'] = fuzz.trimf(vel.universe, [-1, 0, 1])
-    vel['l'] = fuzz.trimf(vel.universe, [0, 1, 2])
-    vel['h'] = fuzz.trimf(vel.universe, [5, 6, 7])
+    vel['z'] = trimf(-1, 0, 1)
+    vel['l'] = trimf(0, 1, 2)
+    vel['h'] = trimf(5, 6, 7)
 
     rules = [
         Rule(dist_min['h'] & dist_wn['l'], vel['h']),
@@ -75,19 +75,23 @@ class TurnLeftToPark(Stage):
         Rule(dist_min['l'], vel['z']),
     ]
 
-    ctrl_system = ctrl.ControlSystem(rules)
-    simulation = ctrl.ControlSystemSimulation(ctrl_system)
+    engine = lazy(RuleBase(rules).stage_engine, 'jit')
 
-    @classmethod
-    def get_velocity(cls, distances):
-        cls.simulation.input['dist_min'] = min(distances.ne, distances.nw, distances.wn)
-        cls.simulation.input['dist_wn'] = distances.wn
-        cls.simulation.compute()
-        velocity = cls.simulation.output['vel']
+    def get_velocity(self, distances):
+        velocity = self.engine.compute(
+            dist_min=min(distances.ne, distances.nw, distances.wn),
+            dist_wn=distances.wn,
+        )
         if abs(velocity) < 0.5:
             return 0
         return velocity
 
+    @classmethod
+    def get_velocities(cls, dist_min, dist_wn):
+        velocities = cls.engine.compute_batch(dist_min=dist_min, dist_wn=dist_wn)
+        velocities[np.abs(velocities) < 0.5] = 0
+        return velocities
+
     def control(self, tank, distances):
         velocity = self.get_velocity(distances)
         tank.turn_left(velocity)
@@ -96,20 +100,20 @@ class TurnLeftToPark(Stage):
 
 class ForwardToFinish(Stage):
 
-    dist_f = Antecedent(np.linspace(0, 6, 100), 'dist_f')
-    dist_b = Antecedent(np.linspace(0, 7, 100), 'dist_b')
-    vel = Consequent(np.linspace(-1, 7, 100), 'vel')
+    dist_f = Input('dist_f', 0, 6)
+    dist_b = Input('dist_b', 0, 7)
+    vel = Output('vel', -1, 7)
 
-    dist_f['l'] = fuzz.trapmf(dist_f.universe, [0, 0, 2.9, 3])
-    dist_f['h'] = fuzz.trapmf(dist_f.universe, [2.9, 3, 6, 6])
+    dist_f['l'] = trapmf(0, 0, 2.9, 3)
+    dist_f['h'] = trapmf(2.9, 3, 6, 6)
 
-    dist_b['l'] = fuzz.trapmf(dist_b.universe, [0, 0, 1.9, 2.1])
-    dist_b['m'] = fuzz.trapmf(dist_b.universe, [1.9, 2.1, 5.4, 5.5])
-    dist_b['h'] = fuzz.trapmf(dist_b.universe, [5.4, 5.5, 7, 7])
+    dist_b['l'] = trapmf(0, 0, 1.9, 2.1)
+    dist_b['m'] = trapmf(1.9, 2.1, 5.4, 5.5)
+    dist_b['h'] = trapmf(5.4, 5.5, 7, 7)
 
-    vel['z'] = fuzz.trimf(vel.universe, [-1, 0, 1])
-    vel['l'] = fuzz.trimf(vel.universe, [2, 3, 4])
-    vel['h'] = fuzz.trimf(vel.universe, [5, 6, 7])
+    vel['z'] = trimf(-1, 0, 1)
+    vel['l'] = trimf(2, 3, 4)
+    vel['h'] = trimf(5, 6, 7)
 
     rules = [
         Rule(dist_f['l'] & dist_b['m'], vel['h']),
@@ -117,19 +121,23 @@ class ForwardToFinish(Stage):
         Rule(dist_f['h'], vel['z']),
     ]
 
-    ctrl_system = ctrl.ControlSystem(rules)
-    simulation = ctrl.ControlSystemSimulation(ctrl_system)
+    engine = lazy(RuleBase(rules).stage_engine, 'jit')
 
-    @classmethod
-    def get_velocity(cls, distances):
-        cls.simulation.input['dist_f'] = min(distances.nw2, distances.ne2)
-        cls.simulation.input['dist_b'] = max(distances.ws2, distances.es2)
-        cls.simulation.compute()
-        velocity = cls.simulation.output['vel']
+    def get_velocity(self, distances):
+        velocity = self.engine.compute(
+            dist_f=min(distances.nw2, distances.ne2),
+            dist_b=max(distances.ws2, distances.es2),
+        )
         if abs(velocity) < 0.5:
             return 0
         return velocity
 
+    @classmethod
+    def get_velocities(cls, dist_f, dist_b):
+        velocities = cls.engine.compute_batch(dist_f=dist_f, dist_b=dist_b)
+        velocities[np.abs(velocities) < 0.5] = 0
+        return velocities
+
     def control(self, tank, distances):
         velocity = self.get_velocity(distances)
         tank.forward(velocity)
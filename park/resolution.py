@@ -0,0 +1,162 @@
+import time
+
+import numpy as np
+
+from .exact import ExactEngine
+from .surface import Surface
+from .system import SkfuzzyEngine
+
+POINTS = [25, 50, 100, 200, 400, 800, 1600, 3200, 6400, 12800]
+CHECK_POINTS = 4000
+SCALAR_CHECKS = 20
+
+
+class Resolution:
+
+    def __init__(self, name, points, engine, error, memory, latency=None):
+        self.name = name
+        self.points = points
+        self.engine = engine
+        self.error = error
+        self.memory = memory
+        self.latency = latency
+
+    def __repr__(self):
+        points = f' {self.points} points' if self.points else ''
+        latency = f', latency {self.latency * 1e6:.0f} us' if self.latency is not None else ''
+        return f'{self.name}{points}: error {self.error:.2g}, memory {self.memory / 1024:.1f} KiB{latency}'
+
+
+def resolve(rule_base, points=POINTS, timed=True):
+    # every candidate with its error against closed-form exact engine, its memory and,
+    # when timed, latency of scalar path; exact engine first, then skfuzzy models from
+    # the coarsest universe up
+    return list(_candidates(rule_base, points, timed))
+
+
+def fastest(candidates, accuracy):
+    # candidates that meet accuracy and answer no slower than exact engine, fastest
+    # first; finer universes are only slower, so only the smallest sampling within
+    # accuracy is kept
+    exact, *sampled = candidates
+    chosen = [exact] if exact.error <= accuracy else []
+    for candidate in sampled:
+        if candidate.error <= accuracy:
+            if candidate.latency <= exact.latency:
+                chosen.append(candidate)
+            break
+    return sorted(chosen, key=lambda candidate: candidate.latency)
+
+
+def choose(rule_base, accuracy, points=POINTS, exact=True):
+    # engine picked without timing, so that every process picks the same: exact engine
+    # when it is within accuracy, otherwise the smallest sampling that is, like in
+    # fastest; without exact only samplings are considered, e.g. for skfuzzy engine
+    candidates = _candidates(rule_base, points, timed=False)
+    reference = next(candidates)
+    if exact and reference.error <= accuracy:
+        return reference.name, reference.points
+
+    for candidate in candidates:
+        if candidate.error <= accuracy:
+            return candidate.name, candidate.points
+    raise ValueError(f'no engine within accuracy {accuracy}')
+
+
+def running(rule_base, engine):
+    # engine a stage actually runs, whatever it is, measured like candidates
+    exact = ExactEngine(rule_base)
+    samples = _samples(exact)
+    reference = exact.compute_batch(**samples)
+
+    error, latency = _check(engine, samples, reference)
+    error = max(error, _error(engine.compute_batch(**samples), reference))
+    return Resolution(type(engine).__name__, None, engine, error, _memory(engine), latency)
+
+
+def _candidates(rule_base, points, timed):
+    exact = ExactEngine(rule_base)
+    samples = _samples(exact)
+    reference = exact.compute_batch(**samples)
+
+    error, latency = _check(exact, samples, reference, timed)
+    yield Resolution('exact', None, exact, error, _memory(exact), latency)
+
+    for size in points:
+        engine = SkfuzzyEngine(rule_base.resample(size).control_system())
+        error, latency = _check(engine, samples, reference, timed)
+        error = max(error, _error(engine.compute_batch(**samples), reference))
+        yield Resolution('skfuzzy', size, engine, error, _memory(engine), latency)
+
+
+def _memory(engine):
+    if isinstance(engine, SkfuzzyEngine):
+        return sum(variable.universe.nbytes + sum(term.mf.nbytes for term in variable.terms.values())
+                   for variable in engine.ctrl_system.fuzzy_variables)
+    if isinstance(engine, Surface):
+        return engine.values.nbytes + sum(knots.nbytes for knots in engine.axes().values())
+    # exact and jit engines keep only parameters of sets and rules
+    return sum(value.nbytes for value in vars(engine).values() if isinstance(value, np.ndarray))
+
+
+def _samples(engine):
+    # dense grid plus knots of every axis and midpoints between them, so that narrow
+    # sets between close knots are never skipped
+    axes = engine.axes()
+    size = int(CHECK_POINTS ** (1 / len(axes)))
+    points = []
+    for knots in axes.values():
+        mids = (knots[:-1] + knots[1:]) / 2
+        points.append(np.unique(np.concatenate([knots, mids, np.linspace(knots[0], knots[-1], size)])))
+    grid = np.meshgrid(*points, indexing='ij')
+    return {label: value.ravel() for label, value in zip(axes, grid)}
+
+
+def _error(values, reference):
+    # sampled model answering where exact does not, or the other way, is treated as miss
+    if np.any(np.isnan(values) != np.isnan(reference)):
+        return np.inf
+    return float(np.nanmax(np.abs(values - reference), initial=0))
+
+
+def _check(engine, samples, reference, timed=True):
+    # scalar path is what stages call every tick, so it is also checked and, for
+    # reports, timed
+    defined = np.flatnonzero(~np.isnan(reference))
+    picked = defined[np.linspace(0, len(defined) - 1, SCALAR_CHECKS).astype(int)]
+
+    error = 0.0
+    durations = []
+    for i in picked:
+        start = time.perf_counter() if timed else 0
+        velocity = engine.compute(**{label: float(value[i]) for label, value in samples.items()})
+        if timed:
+            durations.append(time.perf_counter() - start)
+        error = max(error, abs(velocity - reference[i]))
+
+    return error, float(np.median(durations)) if timed else None
+
+
+if __name__ == '__main__':
+    from utils.control import lazy
+    from . import para, perp
+    from .system import ACCURACY, RuleBase
+
+    for module in (perp, para):
+        for name, stage in vars(module).items():
+            if not isinstance(stage, type):
+                continue
+            if isinstance(vars(stage).get('engine'), lazy):
+                engine, rule_base = stage.engine, RuleBase(stage.rules)
+            elif isinstance(vars(stage).get('_model'), lazy):
+                model = stage._model
+                engine, rule_base = model.engine, model.rule_base
+            else:
+                continue
+
+            candidates = resolve(rule_base)
+            chosen = fastest(candidates, ACCURACY)
+            print(f'{name}: runs {running(rule_base, engine)}')
+            for candidate in candidates:
+                rank = chosen.index(candidate) + 1 if candidate in chosen else '-'
+                print(f'  {rank} {candidate}')
@@ -0,0 +1,151 @@
+from bisect import bisect_right
+from itertools import product
+
+import numpy as np
+
+
+# fractions of intervals where interpolation is checked against engine
+FRACTIONS = (1 / 3, 2 / 3)
+
+
+class Surface:
+
+    # Engine precompiled into values on rectilinear grid of inputs and answered by
+    # multilinear interpolation. Grid starts at knots where memberships bend, that is
+    # at rule boundaries, and intervals are split until interpolation matches the
+    # engine within max_error at thirds of intervals along every axis and of cell
+    # diagonals; midpoints alone miss S-shaped transitions between sets, symmetric
+    # around them
+
+    MAX_POINTS = 10 ** 6
+
+    def __init__(self, axes, values):
+        self._labels = list(axes)
+        self._knots = [np.asarray(knots, dtype=float) for knots in axes.values()]
+        self._values = values = np.ascontiguousarray(values)
+        values.flags.writeable = False
+
+        # plain python lookups for scalar path, numpy call overhead dominates there
+        self._knot_lists = [knots.tolist() for knots in self._knots]
+        self._flat = values.reshape(-1)
+        self._strides = [stride // values.itemsize for stride in values.strides]
+        self._corners = list(product((0, 1), repeat=len(self._labels)))
+
+    @classmethod
+    def compile(cls, engine, max_error=1e-3):
+        axes = engine.axes()
+        labels = list(axes)
+        knots = [np.asarray(k, dtype=float) for k in axes.values()]
+        knots, values = _refine(engine, labels, knots, max_error, cls.MAX_POINTS)
+        return cls(dict(zip(labels, knots)), values)
+
+    @classmethod
+    def from_control_system(cls, ctrl_system, max_error=1e-3):
+        from .system import SkfuzzyEngine
+        return cls.compile(SkfuzzyEngine(ctrl_system), max_error)
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def size(self):
+        return self._values.size
+
+    def context(self):
+        return self
+
+    def axes(self):
+        return dict(zip(self._labels, self._knots))
+
+    def compute(self, **inputs):
+        base = 0
+        fractions = []
+        for label, knots, stride in zip(self._labels, self._knot_lists, self._strides):
+            x = inputs[label]
+            i = min(max(bisect_right(knots, x) - 1, 0), len(knots) - 2)
+            t = min(max((x - knots[i]) / (knots[i + 1] - knots[i]), 0.0), 1.0)
+            base += i * stride
+            fractions.append(t)
+
+        velocity = 0.0
+        for corner in self._corners:
+            weight = 1.0
+            offset = base
+            for bit, t, stride in zip(corner, fractions, self._strides):
+                weight *= t if bit else 1 - t
+                offset += bit * stride
+            velocity += weight * self._flat[offset]
+        return float(velocity)
+
+    def compute_batch(self, **inputs):
+        values = [np.asarray(inputs[label], dtype=float) for label in self._labels]
+        shape = np.broadcast_shapes(*(value.shape for value in values))
+
+        indices = []
+        fractions = []
+        for value, knots in zip(values, self._knots):
+            i = np.clip(np.searchsorted(knots, value, side='right') - 1, 0, len(knots) - 2)
+            t = np.clip((value - knots[i]) / (knots[i + 1] - knots[i]), 0, 1)
+            indices.append(np.broadcast_to(i, shape))
+            fractions.append(np.broadcast_to(t, shape))
+
+        velocities = np.zeros(shape)
+        for corner in self._corners:
+            weight = np.ones(shape)
+            for bit, t in zip(corner, fractions):
+                weight *= t if bit else 1 - t
+            velocities += weight * self._values[tuple(i + bit for i, bit in zip(indices, corner))]
+        return velocities
+
+
+def _refine(engine, labels, knots, max_error, max_points):
+    while True:
+        if np.prod([len(k) for k in knots]) > max_points:
+            raise ValueError(f'could not compile surface within error {max_error}')
+
+        values = _evaluate(engine, labels, knots)
+        mids = [(k[:-1] + k[1:]) / 2 for k in knots]
+
+        # interpolation inside cells is checked along their diagonals
+        center_error = 0
+        if len(knots) > 1:
+            for t in FRACTIONS:
+                approx = values
+                for axis in range(len(knots)):
+                    approx = _between(approx, axis, t)
+                points = [k[:-1] + t * np.diff(k) for k in knots]
+                center_error = np.fmax(center_error, np.abs(approx - _evaluate(engine, labels, points)))
+
+        splits = []
+        for axis, axis_knots in enumerate(knots):
+            error = 0
+            for t in FRACTIONS:
+                points = [axis_knots[:-1] + t * np.diff(axis_knots) if j == axis else k for j, k in enumerate(knots)]
+                error = np.fmax(error, np.abs(_between(values, axis, t) - _evaluate(engine, labels, points)))
+
+            other = tuple(j for j in range(len(knots)) if j != axis)
+            error = np.nanmax(error, axis=other) if other else error
+            error = np.fmax(error, np.nanmax(center_error, axis=other) if other else center_error)
+            splits.append(error > max_error)
+
+        if not any(split.any() for split in splits):
+            return knots, values
+
+        knots = [
+            np.insert(k, np.flatnonzero(split) + 1, mid[split])
+            for k, mid, split in zip(knots, mids, splits)
+        ]
+
+
+def _between(values, axis, t):
+    # linear interpolation at fraction t of every interval along axis
+    size = values.shape[axis]
+    lower = np.take(values, range(size - 1), axis=axis)
+    upper = np.take(values, range(1, size), axis=axis)
+    return (1 - t) * lower + t * upper
+
+
+def _evaluate(engine, labels, points):
+    grid = np.meshgrid(*points, indexing='ij')
+    return engine.compute_batch(**dict(zip(labels, grid)))
@@ -0,0 +1,270 @@
+import copy
+import hashlib
+import os
+from importlib.metadata import version
+
+import numpy as np
+
+from .batch import evaluate
+
+SURFACE_FORMAT = 2
+
+# maximum output error of auto engine, in output units, when none is given
+ACCURACY = 1e-2
+
+# engine of every stage model when set; skfuzzy runs stages on universes they were
+# tuned with, so wheel commands of original controllers can be reproduced
+STAGE_ENGINE = os.environ.get('FUZZY_PARK_ENGINE') or None
+
+
+class Shape:
+
+    def __init__(self, kind, a, b, c, d):
+        self.kind = kind
+        self.a, self.b, self.c, self.d = float(a), float(b), float(c), float(d)
+
+    @property
+    def params(self):
+        if self.kind == 'trimf':
+            return [self.a, self.b, self.d]
+        return [self.a, self.b, self.c, self.d]
+
+    def sample(self, universe):
+        import skfuzzy as fuzz
+        return getattr(fuzz, self.kind)(universe, self.params)
+
+    def __repr__(self):
+        return f'{self.kind}({", ".join(f"{p:g}" for p in self.params)})'
+
+
+def trimf(a, b, c):
+    return Shape('trimf', a, b, b, c)
+
+
+def trapmf(a, b, c, d):
+    return Shape('trapmf', a, b, c, d)
+
+
+class Predicate:
+
+    def __and__(self, other):
+        return Expression('and', self, other)
+
+    def __or__(self, other):
+        return Expression('or', self, other)
+
+    def __invert__(self):
+        return Expression('not', self)
+
+
+class Term(Predicate):
+
+    def __init__(self, variable, label):
+        self.variable = variable
+        self.label = label
+
+    @property
+    def shape(self):
+        return self.variable.terms[self.label]
+
+    def __repr__(self):
+        return f'{self.variable.label}[{self.label}]'
+
+
+class Expression(Predicate):
+
+    def __init__(self, kind, first, second=None):
+        self.kind = kind
+        self.first = first
+        self.second = second
+
+    def __repr__(self):
+        if self.kind == 'not':
+            return f'NOT {self.first!r}'
+        return f'({self.first!r} {self.kind.upper()} {self.second!r})'
+
+
+class Variable:
+
+    def __init__(self, label, low, high, points=100):
+        self.label = label
+        self.low = low
+        self.high = high
+        self.points = points
+        self.terms = {}
+
+    def __setitem__(self, label, shape):
+        self.terms[label] = shape
+
+    def __getitem__(self, label):
+        if label not in self.terms:
+            raise KeyError(f'{self.label} has no term {label}')
+        return Term(self, label)
+
+
+class Input(Variable):
+    pass
+
+
+class Output(Variable):
+    pass
+
+
+class Rule:
+
+    def __init__(self, antecedent, consequent):
+        self.antecedent = antecedent
+        self.consequent = consequent
+
+    def __repr__(self):
+        return f'IF {self.antecedent!r} THEN {self.consequent!r}'
+
+
+class RuleBase:
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+
+        self.inputs = []
+        for rule in self.rules:
+            for variable in _variables(rule.antecedent):
+                if variable not in self.inputs:
+                    self.inputs.append(variable)
+
+        outputs = {rule.consequent.variable for rule in self.rules}
+        if len(outputs) != 1:
+            raise ValueError('rule base must have exactly one output variable')
+        self.output = outputs.pop()
+
+    def control_system(self):
+        from skfuzzy import control as ctrl
+
+        variables = {}
+        for variable in self.inputs + [self.output]:
+            kind = ctrl.Antecedent if isinstance(variable, Input) else ctrl.Consequent
+            universe = np.linspace(variable.low, variable.high, variable.points)
+            variables[variable] = kind(universe, variable.label)
+            for label, shape in variable.terms.items():
+                variables[variable][label] = shape.sample(universe)
+
+        def convert(predicate):
+            if isinstance(predicate, Term):
+                return variables[predicate.variable][predicate.label]
+            if predicate.kind == 'not':
+                return ~convert(predicate.first)
+            if predicate.kind == 'and':
+                return convert(predicate.first) & convert(predicate.second)
+            return convert(predicate.first) | convert(predicate.second)
+
+        return ctrl.ControlSystem([
+            ctrl.Rule(convert(rule.antecedent), convert(rule.consequent))
+            for rule in self.rules
+        ])
+
+    def resample(self, points):
+        # copy with every universe sampled at given number of points
+        rule_base = copy.deepcopy(self)
+        for variable in rule_base.inputs + [rule_base.output]:
+            variable.points = points
+        return rule_base
+
+    def fingerprint(self, *extra):
+        lines = [repr(extra)]
+        for variable in self.inputs + [self.output]:
+            lines.append(f'{type(variable).__name__} {variable.label} {variable.low!r} {variable.high!r} {variable.points}')
+            lines.extend(f'{label} {shape.kind} {shape.params!r}' for label, shape in variable.terms.items())
+        lines.extend(repr(rule) for rule in self.rules)
+        return hashlib.sha256('\n'.join(lines).encode()).hexdigest()
+
+    def engine(self, name='skfuzzy', *, accuracy=None, compiled=False, max_error=1e-3, cache=True):
+        # accuracy is maximum output error; auto picks exact engine or the smallest
+        # sampling within it, skfuzzy the smallest sampling, or without accuracy runs on
+        # universes of variables; exact and jit meet any accuracy
+        from . import cache as surface_cache
+        from .exact import ExactEngine
+        from .resolution import choose
+        from .surface import Surface
+
+        if name == 'auto' or name == 'skfuzzy' and accuracy is not None:
+            # picked once per rule base and accuracy without timing, see resolution.choose
+            accuracy = ACCURACY if accuracy is None else accuracy
+            backend = version('scikit-fuzzy'), accuracy
+
+            def build():
+                pick = lambda: choose(self, accuracy, exact=name == 'auto')
+                chosen, points = surface_cache.chosen(self.fingerprint(name, backend), pick) if cache else pick()
+                if chosen == 'exact':
+                    return ExactEngine(self)
+                return SkfuzzyEngine(self.resample(points).control_system())
+        elif name == 'skfuzzy':
+            build = lambda: SkfuzzyEngine(self.control_system())
+            backend = version('scikit-fuzzy')
+        elif name == 'exact':
+            build = lambda: ExactEngine(self)
+            backend = None
+        elif name == 'jit':
+            from .jit import JitEngine
+            build = lambda: JitEngine(self)
+            backend = None
+        else:
+            raise ValueError(f'unknown engine {name}, expected auto, skfuzzy, exact or jit')
+
+        if not compiled:
+            return build()
+
+        if not cache:
+            return Surface.compile(build(), max_error)
+
+        key = self.fingerprint(SURFACE_FORMAT, name, backend, max_error)
+        return surface_cache.compiled(key, lambda: Surface.compile(build(), max_error))
+
+    def stage_engine(self, name, **options):
+        # engine chosen by stage, unless STAGE_ENGINE overrides it
+        if STAGE_ENGINE is not None:
+            return self.engine(STAGE_ENGINE)
+        return self.engine(name, **options)
+
+
+class SkfuzzyEngine:
+
+    def __init__(self, ctrl_system):
+        from skfuzzy import control as ctrl
+
+        self.ctrl_system = ctrl_system
+        self.simulation = ctrl.ControlSystemSimulation(ctrl_system)
+        self._output = next(iter(ctrl_system.consequents)).label
+
+    def context(self):
+        # skfuzzy keeps evaluation state inside terms of control system, so every
+        # context gets its own copy of it
+        return SkfuzzyEngine(copy.deepcopy(self.ctrl_system))
+
+    def axes(self):
+        # universe samples where any membership function bends, skfuzzy
+        # interpolates memberships linearly between them
+        axes = {}
+        for antecedent in self.ctrl_system.antecedents:
+            universe = antecedent.universe
+            knots = [universe[0], universe[-1]]
+            for term in antecedent.terms.values():
+                bends = np.abs(np.diff(term.mf, 2)) > 1e-9
+                knots.extend(universe[1:-1][bends])
+            axes[antecedent.label] = np.unique(knots)
+        return axes
+
+    def compute(self, **inputs):
+        self.simulation.inputs(inputs)
+        self.simulation.compute()
+        return self.simulation.output[self._output]
+
+    def compute_batch(self, **inputs):
+        return evaluate(self.ctrl_system, **inputs)[self._output]
+
+
+def _variables(predicate):
+    if isinstance(predicate, Term):
+        return [predicate.variable]
+    variables = _variables(predicate.first)
+    if predicate.second is not None:
+        variables += _variables(predicate.second)
+    return variables
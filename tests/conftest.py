@@ -0,0 +1,11 @@
+import pytest
+
+from park import cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    # every test starts with empty cache of its own
+    path = tmp_path / 'cache'
+    monkeypatch.setattr(cache, 'CACHE_DIR', str(path))
+    return path
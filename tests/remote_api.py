@@ -0,0 +1,70 @@
+import importlib
+import sys
+import types
+
+import api
+import utils
+
+
+class RemoteApi(types.ModuleType):
+
+    # stand-in for api.vrep, which loads remote API library only found next to simulator;
+    # scene is a dict of object names and handles, every call is recorded
+
+    simx_return_ok = 0
+    simx_return_remote_error_flag = 8
+    simx_opmode_oneshot = 0
+    simx_opmode_blocking = 65536
+    simx_opmode_streaming = 131072
+    simx_opmode_buffer = 393216
+    sim_stringparam_scene_path_and_name = 13
+    sim_appobj_object_type = 109
+
+    def __init__(self):
+        super().__init__('api.vrep')
+        self.objects = {}
+        self.scene_path = 'parking.ttt'
+        self.grouped = True
+        self.calls = []
+        self.clients = 0
+
+    def simxStart(self, host, port, *options):
+        self.calls.append(('start', host, port))
+        self.clients += 1
+        return self.clients
+
+    def simxFinish(self, client_id):
+        self.calls.append(('finish', client_id))
+
+    def simxGetStringParameter(self, client_id, parameter, mode):
+        self.calls.append(('path',))
+        if self.scene_path is None:
+            return self.simx_return_remote_error_flag, ''
+        return self.simx_return_ok, self.scene_path
+
+    def simxGetObjectGroupData(self, client_id, object_type, data_type, mode):
+        self.calls.append(('group',))
+        if not self.grouped:
+            return self.simx_return_remote_error_flag, [], [], [], []
+        return self.simx_return_ok, list(self.objects.values()), [], [], list(self.objects)
+
+    def simxGetObjectHandle(self, client_id, name, mode):
+        self.calls.append(('handle', name))
+        if name not in self.objects:
+            return self.simx_return_remote_error_flag, 0
+        return self.simx_return_ok, self.objects[name]
+
+    def lookups(self):
+        return [call for call in self.calls if call[0] in ('group', 'handle')]
+
+
+def install(monkeypatch):
+    # utils.tank is imported again over fake, both are restored after test
+    remote_api = RemoteApi()
+    monkeypatch.setitem(sys.modules, 'api.vrep', remote_api)
+    monkeypatch.setattr(api, 'vrep', remote_api, raising=False)
+    monkeypatch.delitem(sys.modules, 'utils.tank', raising=False)
+    monkeypatch.delattr(utils, 'tank', raising=False)
+    tank = importlib.import_module('utils.tank')
+    monkeypatch.setattr(tank, 'HANDLES', {})
+    return remote_api, tank
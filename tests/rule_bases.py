@@ -0,0 +1,12 @@
+from park import para, perp
+from park.model import FuzzyModel
+from park.system import RuleBase
+
+# rule bases of stages, both two-input ones and the one-input FuzzyModel
+RULE_BASES = {
+    'turn_left_to_park': RuleBase(perp.TurnLeftToPark.rules),
+    'forward_to_finish': RuleBase(perp.ForwardToFinish.rules),
+    'last_adjustment': RuleBase(para.LastAdjustment.rules),
+    'model': FuzzyModel(max_vel=10, break_vel=3, stop_dist=1.55, break_dist=2.05, sharpness=0.2,
+                        engine='exact').rule_base,
+}
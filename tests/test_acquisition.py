@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pytest
+
+from utils.acquisition import Acquisition, Slot
+from utils.simulator import PARALLEL, SimulatedTank
+
+
+def test_take_gives_newest_value():
+    slot = Slot()
+    slot.publish(1)
+    slot.publish(2)
+    assert slot.take() == 2
+    assert slot.take() == 2
+    assert slot.published == 2
+
+
+def test_take_times_out_while_nothing_published():
+    with pytest.raises(TimeoutError):
+        Slot().take(timeout=0.01)
+
+
+def test_take_waits_for_publisher():
+    slot = Slot()
+    timer = threading.Timer(0.01, slot.publish, (3,))
+    timer.start()
+    assert slot.take(timeout=5) == 3
+    timer.join()
+
+
+def test_publisher_failure_is_raised_in_readers():
+    def poll():
+        raise RuntimeError('sensor lost')
+
+    acquisition = Acquisition(poll, 0.001).start()
+    with pytest.raises(RuntimeError, match='sensor lost'):
+        acquisition.slot.take(timeout=5)
+    acquisition.stop()
+
+
+def test_stop_joins_thread():
+    calls = []
+    acquisition = Acquisition(lambda: calls.append(None) or len(calls), 0.001).start()
+    assert acquisition.slot.take(timeout=5) >= 1
+    acquisition.stop()
+    assert not acquisition._thread.is_alive()
+
+    published = acquisition.slot.published
+    assert len(calls) == published
+
+
+def test_simulator_polls_while_stepping():
+    tank = SimulatedTank(PARALLEL)
+    tank.start_acquisition(interval=0)
+    try:
+        tank.forward(1)
+        for _ in range(200):
+            tank.step()
+            assert np.all(np.asarray(tank.read_distances()) >= 0)
+    finally:
+        tank.stop_acquisition()
+    assert tank.ticks == 200
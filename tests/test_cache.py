@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+
+from park import cache
+from park.surface import Surface
+from park.system import SURFACE_FORMAT
+from rule_bases import RULE_BASES
+
+
+def surface():
+    return Surface({'x': np.array([0.0, 1.0, 3.0]), 'y': np.array([-1.0, 1.0])}, np.arange(6.0).reshape(3, 2))
+
+
+def test_round_trip():
+    saved = surface()
+    cache.save('key', saved)
+    loaded = cache.load('key')
+
+    assert list(loaded.axes()) == ['x', 'y']
+    for label, knots in saved.axes().items():
+        np.testing.assert_array_equal(loaded.axes()[label], knots)
+    np.testing.assert_array_equal(loaded.values, saved.values)
+    assert loaded.compute(x=2.0, y=0.0) == saved.compute(x=2.0, y=0.0)
+
+
+def test_missing_entry():
+    assert cache.load('missing') is None
+
+
+def test_partial_entry_is_ignored(cache_dir):
+    os.makedirs(cache_dir / 'key')
+    (cache_dir / 'key' / 'axes.json').write_text('["x"]')
+    assert cache.load('key') is None
+
+
+def test_compiled_builds_once():
+    builds = []
+
+    def build():
+        builds.append(None)
+        return surface()
+
+    first = cache.compiled('key', build)
+    second = cache.compiled('key', build)
+    assert len(builds) == 1
+    np.testing.assert_array_equal(first.values, second.values)
+
+
+def test_unwritable_directory_still_builds(monkeypatch, tmp_path):
+    (tmp_path / 'file').write_text('')
+    monkeypatch.setattr(cache, 'CACHE_DIR', str(tmp_path / 'file' / 'cache'))
+    assert cache.compiled('key', surface).size == 6
+
+
+def test_engine_uses_fingerprint(cache_dir):
+    rule_base = RULE_BASES['model']
+    surface = rule_base.engine('exact', compiled=True)
+    key = rule_base.fingerprint(SURFACE_FORMAT, 'exact', None, 1e-3)
+    assert os.listdir(cache_dir) == [key]
+    np.testing.assert_array_equal(rule_base.engine('exact', compiled=True).values, surface.values)
@@ -0,0 +1,89 @@
+import ast
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+CODECS = ['simxPackInts', 'simxUnpackInts', 'simxPackFloats', 'simxUnpackFloats', 'simxPackIntsArray',
+          'simxUnpackIntsArray', 'simxPackFloatsArray', 'simxUnpackFloatsArray', '_unpackArray']
+
+
+def load_codecs():
+    # api.vrep loads remote API library on import, which is only there next to simulator;
+    # codecs are pure python, so without it they are taken from its source
+    try:
+        from api import vrep
+        return vars(vrep)
+    except (OSError, AttributeError):
+        source = (Path(__file__).parent.parent / 'api' / 'vrep.py').read_text()
+        nodes = [node for node in ast.parse(source).body if isinstance(node, ast.FunctionDef) and node.name in CODECS]
+        namespace = {'np': np, 'sys': sys}
+        exec(compile(ast.Module(nodes, []), 'vrep.py', 'exec'), namespace)
+        return namespace
+
+
+codecs = load_codecs()
+
+
+@pytest.mark.parametrize('values', [[], [0], [1, -2, 3], [-2**31, 2**31 - 1]])
+def test_ints_round_trip(values):
+    packed = codecs['simxPackInts'](values)
+    assert isinstance(packed, bytearray)
+    assert bytes(packed) == struct.pack(f'<{len(values)}i', *values)
+    assert codecs['simxUnpackInts'](packed) == values
+    assert codecs['simxUnpackInts'](bytes(packed)) == values
+    assert codecs['simxUnpackInts'](bytes(packed).decode('latin-1')) == values
+
+
+@pytest.mark.parametrize('values', [[], [0.0], [1.5, -2.25, 1e6]])
+def test_floats_round_trip(values):
+    packed = codecs['simxPackFloats'](values)
+    assert bytes(packed) == struct.pack(f'<{len(values)}f', *values)
+    assert codecs['simxUnpackFloats'](packed) == values
+
+
+def test_arrays_round_trip():
+    ints = np.arange(-5, 5)
+    packed = codecs['simxPackIntsArray'](ints)
+    unpacked = codecs['simxUnpackIntsArray'](packed)
+    np.testing.assert_array_equal(unpacked, ints)
+    assert not unpacked.flags.writeable
+
+    floats = np.linspace(-1, 1, 9)
+    unpacked = codecs['simxUnpackFloatsArray'](codecs['simxPackFloatsArray'](floats))
+    np.testing.assert_array_equal(unpacked, floats.astype(np.float32))
+
+
+def test_unpack_ignores_trailing_bytes():
+    assert codecs['simxUnpackInts'](struct.pack('<2i', 7, 8) + b'\0') == [7, 8]
+
+
+@pytest.mark.parametrize('values', [[1.5], np.array([0.5, 1.0]), ['1']])
+def test_pack_ints_rejects_non_integral(values):
+    with pytest.raises(TypeError):
+        codecs['simxPackInts'](values)
+
+
+@pytest.mark.parametrize('values', [[2**31], [-2**31 - 1], np.array([2**40])])
+def test_pack_ints_rejects_out_of_range(values):
+    with pytest.raises(ValueError):
+        codecs['simxPackIntsArray'](values)
+
+
+@pytest.mark.parametrize('values', [['1.5'], np.array([1 + 2j]), [None]])
+def test_pack_floats_rejects_non_numeric(values):
+    with pytest.raises(TypeError):
+        codecs['simxPackFloats'](values)
+
+
+@pytest.mark.parametrize('values', [[1e39], np.array([0.0, -1e300])])
+def test_pack_floats_rejects_out_of_range(values):
+    with pytest.raises(OverflowError):
+        codecs['simxPackFloatsArray'](values)
+
+
+def test_pack_floats_keeps_non_finite():
+    values = [np.inf, -np.inf, np.nan, True, 3]
+    assert bytes(codecs['simxPackFloats'](values)) == struct.pack('<5f', *values)
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from remote_api import install
+from utils.connections import Connections
+
+ADDRESSES = [('127.0.0.1', 19999), ('127.0.0.1', 20000)]
+
+
+class StubTank:
+
+    # tank of one simulator, without connecting to it
+
+    def __init__(self, address, **options):
+        self.address = address
+        self.options = options
+        self.closed = False
+        self.ticks = 0
+
+    def close(self):
+        self.closed = True
+
+    def read_distances(self):
+        return self.ticks
+
+    def step(self):
+        self.ticks += 1
+
+    def time(self):
+        return float(self.ticks)
+
+
+class Counter:
+
+    # controller finishing after three ticks of its tank
+
+    def __init__(self, tank):
+        self.tank = tank
+
+    def warm_up(self):
+        pass
+
+    async def control_async(self):
+        await self.tank.step()
+        return await self.tank.read_distances() >= 3
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    _, tank = install(monkeypatch)
+    monkeypatch.setattr(tank, 'Tank', StubTank)
+    return Connections(ADDRESSES, synchronous=True)
+
+
+def test_tank_per_address(connections):
+    first, second = connections.tanks()
+    assert first.address == ADDRESSES[0] and second.address == ADDRESSES[1]
+    assert first.options == {'synchronous': True}
+    assert connections.tank(list(ADDRESSES[0])) is first
+
+
+def test_unknown_address(connections):
+    with pytest.raises(KeyError, match='127.0.0.1:1'):
+        connections.tank(('127.0.0.1', 1))
+
+
+def test_close_one(connections):
+    first, second = connections.tanks()
+    connections.close(ADDRESSES[0])
+    assert first.closed and not second.closed
+    assert connections.tank(ADDRESSES[0]) is not first
+
+    # closing again does nothing
+    connections.close(ADDRESSES[0])
+    connections.close(ADDRESSES[0])
+
+
+def test_close_all(connections):
+    with connections:
+        tanks = connections.tanks()
+    assert all(tank.closed for tank in tanks)
+    assert connections._tanks == {}
+
+
+def test_run_episode_on_every_simulator(connections):
+    schedulers = asyncio.run(connections.run(Counter))
+    assert [scheduler.ticks for scheduler in schedulers] == [3, 3]
+    assert [tank.ticks for tank in connections.tanks()] == [3, 3]
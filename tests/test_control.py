@@ -0,0 +1,45 @@
+from utils.control import Controller, Stage
+from utils.simulator import SimulatedTank
+
+
+class Forward(Stage):
+
+    def control(self, tank, distances):
+        tank.forward(1)
+        return tank.time() - self.start > 0.5
+
+
+class Bare:
+
+    # tank of some other backend, without telemetry of its own
+
+    def __init__(self):
+        self.tank = SimulatedTank()
+
+    def __getattr__(self, name):
+        if name == 'telemetry':
+            raise AttributeError(name)
+        return getattr(self.tank, name)
+
+
+def run(controller):
+    ticks = 0
+    while not controller.control():
+        ticks += 1
+    return ticks
+
+
+def test_records_to_telemetry_of_tank():
+    tank = SimulatedTank()
+    controller = Controller(tank, [Forward()])
+    assert controller.telemetry is tank.telemetry
+
+    ticks = run(controller)
+    assert len(tank.telemetry) == ticks + 1
+    assert tank.telemetry.stages == ['WaitSomeTime', 'Forward']
+
+
+def test_tank_without_telemetry():
+    controller = Controller(Bare(), [Forward()])
+    ticks = run(controller)
+    assert len(controller.telemetry) == ticks + 1
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from park.model import FuzzyModel
+from park.system import SkfuzzyEngine
+from rule_bases import RULE_BASES
+
+
+def sample(engine, size, seed=0):
+    # random points of universes, inputs exactly on set breakpoints are sensitive to
+    # sampling of skfuzzy
+    rng = np.random.default_rng(seed)
+    return {label: rng.uniform(knots[0], knots[-1], size) for label, knots in engine.axes().items()}
+
+
+@pytest.mark.parametrize('name', RULE_BASES)
+def test_exact_matches_finely_sampled_skfuzzy(name):
+    rule_base = RULE_BASES[name]
+    exact = rule_base.engine('exact')
+    inputs = sample(exact, 50)
+
+    reference = SkfuzzyEngine(rule_base.resample(20001).control_system()).compute_batch(**inputs)
+    np.testing.assert_allclose(exact.compute_batch(**inputs), reference, atol=1e-6)
+
+
+@pytest.mark.parametrize('name', RULE_BASES)
+def test_exact_scalar_matches_batch(name):
+    exact = RULE_BASES[name].engine('exact')
+    inputs = sample(exact, 20)
+    batch = exact.compute_batch(**inputs)
+    for i in range(len(batch)):
+        assert exact.compute(**{label: value[i] for label, value in inputs.items()}) == pytest.approx(batch[i])
+
+
+def test_empty_batch():
+    exact = RULE_BASES['turn_left_to_park'].engine('exact')
+    assert exact.compute_batch(dist_min=[], dist_wn=[]).shape == (0,)
+
+    model = FuzzyModel(max_vel=10, break_vel=3, stop_dist=1.55, break_dist=2.05, sharpness=0.2, engine='exact')
+    assert model.get_velocities([]).shape == (0,)
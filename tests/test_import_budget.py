@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_BUDGET = 0.5
+HEAVY_MODULES = ['matplotlib', 'numba', 'skfuzzy']
+
+
+def measure(module):
+    # fresh interpreter, so that nothing is imported yet
+    code = (
+        'import sys, time\n'
+        'start = time.perf_counter()\n'
+        f'import {module}\n'
+        'print(time.perf_counter() - start)\n'
+        f'print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n'
+    )
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+    duration, heavy = output.stdout.splitlines()[-2:]
+    return float(duration), [m for m in heavy.split(',') if m]
+
+
+@pytest.mark.parametrize('module', ['park', 'park.model', 'utils.simulator'])
+def test_import_within_budget(module):
+    # best of few runs, first one may pay for cold disk cache
+    runs = [measure(module) for _ in range(3)]
+    assert min(duration for duration, _ in runs) < IMPORT_BUDGET
+    assert all(not heavy for _, heavy in runs)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from park.system import SkfuzzyEngine
+from rule_bases import RULE_BASES
+from test_exact import sample
+
+pytest.importorskip('numba')
+
+
+@pytest.mark.parametrize('name', RULE_BASES)
+def test_jit_matches_exact(name):
+    rule_base = RULE_BASES[name]
+    jit = rule_base.engine('jit')
+    inputs = sample(jit, 1000)
+    np.testing.assert_allclose(jit.compute_batch(**inputs), rule_base.engine('exact').compute_batch(**inputs),
+                               atol=1e-9)
+
+
+@pytest.mark.parametrize('name', RULE_BASES)
+def test_jit_matches_finely_sampled_skfuzzy(name):
+    rule_base = RULE_BASES[name]
+    jit = rule_base.engine('jit')
+    inputs = sample(jit, 50)
+
+    reference = SkfuzzyEngine(rule_base.resample(20001).control_system()).compute_batch(**inputs)
+    np.testing.assert_allclose(jit.compute_batch(**inputs), reference, atol=1e-6)
+
+
+def test_jit_scalar_matches_batch():
+    jit = RULE_BASES['turn_left_to_park'].engine('jit')
+    inputs = sample(jit, 20)
+    batch = jit.compute_batch(**inputs)
+    for i in range(len(batch)):
+        assert jit.compute(**{label: value[i] for label, value in inputs.items()}) == pytest.approx(batch[i])
+
+
+def test_jit_empty_batch():
+    jit = RULE_BASES['turn_left_to_park'].engine('jit')
+    assert jit.compute_batch(dist_min=[], dist_wn=[]).shape == (0,)
@@ -0,0 +1,42 @@
+import time
+
+from park import ParaParkController
+from utils.control import Controller, Stage
+from utils.simulator import PARALLEL, SimulatedTank, simulate
+
+
+class SlowStart(Stage):
+
+    def started(self, tank, distances):
+        super().started(tank, distances)
+        time.sleep(0.05)
+
+    def control(self, tank, distances):
+        tank.forward(1)
+        return tank.time() - self.start > 0.5
+
+
+def test_startup_is_not_control():
+    controller = Controller(SimulatedTank(), [SlowStart()])
+    latency = controller.record_latency()
+    while not controller.control():
+        pass
+
+    summary = latency.summary()['SlowStart']
+    assert summary['startup']['count'] == 1
+    assert summary['startup']['p50'] >= 0.05
+    assert summary['control']['p99'] < 0.05
+    assert summary['control']['count'] == summary['read']['count']
+
+
+def test_every_stage_records_startup():
+    latency = []
+
+    def controller(tank):
+        controller = ParaParkController(tank)
+        latency.append(controller.record_latency())
+        return controller
+
+    assert simulate(controller, PARALLEL).finished
+    for stage, phases in latency[0].summary().items():
+        assert phases['startup']['count'] == 1, stage
@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+
+from park import resolution
+from park.model import FuzzyModel
+from park.exact import ExactEngine
+from park.resolution import choose, fastest, resolve, running
+from park.system import RuleBase, SkfuzzyEngine
+from rule_bases import RULE_BASES
+
+
+def test_resolve_reports_every_candidate():
+    candidates = resolve(RULE_BASES['model'], points=[25, 50, 100])
+    assert [(candidate.name, candidate.points) for candidate in candidates] == [
+        ('exact', None), ('skfuzzy', 25), ('skfuzzy', 50), ('skfuzzy', 100)]
+    assert all(candidate.error >= 0 and candidate.memory > 0 and candidate.latency > 0 for candidate in candidates)
+
+
+def test_fastest_keeps_accurate_candidates():
+    candidates = resolve(RULE_BASES['model'], points=[25, 50, 100])
+    for accuracy in (1e-9, 1e-2, 1):
+        chosen = fastest(candidates, accuracy)
+        assert chosen[0].name == 'exact' or chosen[0].latency <= candidates[0].latency
+        assert all(candidate.error <= accuracy for candidate in chosen)
+
+
+def test_choose_does_not_time(monkeypatch):
+    monkeypatch.setattr(resolution.time, 'perf_counter', None)
+    assert choose(RULE_BASES['turn_left_to_park'], 1e-2) == ('exact', None)
+
+
+def test_auto_choice_is_cached(cache_dir, monkeypatch):
+    rule_base = RULE_BASES['last_adjustment']
+    assert isinstance(rule_base.engine('auto'), ExactEngine)
+    entries = os.listdir(cache_dir)
+    assert len(entries) == 1 and json.loads((cache_dir / entries[0]).read_text()) == ['exact', None]
+
+    # later processes reuse the choice
+    monkeypatch.setattr('park.resolution.choose', None)
+    assert isinstance(rule_base.engine('auto'), ExactEngine)
+
+
+def test_choose_smallest_sampling_within_accuracy():
+    rule_base = RULE_BASES['model']
+    candidates = resolve(rule_base, timed=False)
+    for accuracy in (0.5, 0.05):
+        name, points = choose(rule_base, accuracy, exact=False)
+        within = [candidate.points for candidate in candidates[1:] if candidate.error <= accuracy]
+        assert name == 'skfuzzy' and points == within[0]
+
+
+def test_skfuzzy_keeps_universes_without_accuracy():
+    model = FuzzyModel(max_vel=10, break_vel=3, stop_dist=1.55, break_dist=2.05, sharpness=0.2, engine='skfuzzy')
+    universes = [len(variable.universe) for variable in model._model.ctrl_system.fuzzy_variables]
+    assert universes == [FuzzyModel.POINTS] * 2
+
+
+def test_skfuzzy_meets_accuracy():
+    rule_base = RULE_BASES['model']
+    engine = rule_base.engine('skfuzzy', accuracy=0.05)
+    exact = rule_base.engine('exact')
+    distances = np.linspace(0, 6, 500)
+    assert np.nanmax(np.abs(engine.compute_batch(dist=distances) - exact.compute_batch(dist=distances))) <= 0.05
+
+
+def test_stage_engine_override(monkeypatch):
+    from park import para, perp, system
+
+    rule_base = RuleBase(perp.TurnLeftToPark.rules)
+    assert type(rule_base.stage_engine('jit')).__name__ == 'JitEngine'
+
+    monkeypatch.setattr(system, 'STAGE_ENGINE', 'skfuzzy')
+    engine = rule_base.stage_engine('jit')
+    assert [len(variable.universe) for variable in engine.ctrl_system.fuzzy_variables] == [100] * 3
+
+    engine = RuleBase(para.DriveCloserSecondTurn.rules).stage_engine('auto', accuracy=0.01)
+    assert sorted(len(variable.universe) for variable in engine.ctrl_system.fuzzy_variables) == [200, 10000]
+
+    model = FuzzyModel(max_vel=10, break_vel=3, stop_dist=1.55, break_dist=2.05, sharpness=0.2)
+    assert isinstance(model._model, SkfuzzyEngine)
+
+
+def test_running_reports_engine_of_stage():
+    rule_base = RULE_BASES['turn_left_to_park']
+    report = running(rule_base, rule_base.engine('exact', compiled=True, max_error=1e-2))
+    assert report.name == 'Surface'
+    assert 0 < report.error < 1.5e-2
+    assert report.memory > resolve(rule_base, points=[])[0].memory
+
+
+def test_batch_chunks_fit_universe():
+    from park import batch
+
+    engine = RULE_BASES['model'].resample(12800).engine('skfuzzy')
+    distances = np.linspace(0, 6, 1000)
+    np.testing.assert_allclose(engine.compute_batch(dist=distances),
+                               batch.evaluate(engine.ctrl_system, chunk_size=1000, dist=distances)['vel'])
@@ -0,0 +1,79 @@
+import asyncio
+
+from utils.schedule import Scheduler
+
+
+class Clock:
+
+    # simulated time, ticks take as long as their step says
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+def run(durations, rate=10):
+    clock = Clock()
+    durations = iter(durations)
+
+    def step():
+        duration = next(durations, None)
+        if duration is None:
+            return True
+        clock.now += duration
+        return False
+
+    return Scheduler(rate, clock, clock.sleep).run(step), clock
+
+
+def test_sleeps_until_deadline():
+    scheduler, clock = run([0.02, 0.05, 0.01])
+    assert scheduler.ticks == 4
+    assert scheduler.overruns == 0
+    assert [round(delay, 9) for delay in clock.sleeps] == [0.08, 0.05, 0.09]
+
+
+def test_overrun_skips_missed_periods():
+    scheduler, clock = run([0.02, 0.25, 0.01])
+    assert scheduler.overruns == 1
+    assert scheduler.missed == 2
+    assert round(clock.now, 9) == 0.5
+
+
+def test_last_tick_overrun_is_counted():
+    clock = Clock()
+
+    def step():
+        clock.now += 0.25
+        return True
+
+    scheduler = Scheduler(10, clock, clock.sleep).run(step)
+    assert scheduler.ticks == 1
+    assert scheduler.overruns == 1
+    assert scheduler.missed == 2
+    assert clock.sleeps == []
+
+
+def test_as_fast_as_possible():
+    scheduler, clock = run([0.5, 0.5], rate=None)
+    assert scheduler.ticks == 3
+    assert scheduler.overruns == 0
+    assert clock.sleeps == []
+
+
+def test_async():
+    ticks = []
+
+    async def step():
+        ticks.append(None)
+        return len(ticks) == 3
+
+    scheduler = asyncio.run(Scheduler(1000).run_async(step))
+    assert scheduler.ticks == 3
@@ -0,0 +1,32 @@
+import math
+
+from park import ParaParkController
+from utils.simulator import MAX_TICKS, PARALLEL, SimulatedTank, simulate, simulate_many
+
+
+def test_parallel_parking_finishes():
+    tank = simulate(ParaParkController, PARALLEL)
+    assert tank.finished
+    assert tank.collisions == 0
+    assert tank.ticks < MAX_TICKS / 2
+
+
+def test_episodes_are_reproducible():
+    first = simulate_many(ParaParkController, PARALLEL, episodes=2, seed=1)
+    second = simulate_many(ParaParkController, PARALLEL, episodes=2, seed=1)
+    assert [tank.pose for tank in first] == [tank.pose for tank in second]
+
+
+def test_straight_drive():
+    tank = SimulatedTank(PARALLEL)
+    tank.forward(1)
+    for _ in range(20):
+        tank.step()
+    x, y, heading = tank.pose
+    assert abs(x) < 1e-9 and y > 0 and heading == math.pi / 2
+    assert tank.time() == 20 * tank.dt
+
+
+def test_max_ticks_gives_up():
+    tank = simulate(ParaParkController, PARALLEL, max_ticks=10)
+    assert not tank.finished and tank.ticks == 10
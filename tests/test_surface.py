@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from park.surface import Surface
+from rule_bases import RULE_BASES
+from test_exact import sample
+
+
+@pytest.mark.parametrize('name, max_error', [
+    ('model', 1e-3),
+    ('model', 1e-4),
+    ('last_adjustment', 1e-2),
+    ('last_adjustment', 1e-3),
+    ('turn_left_to_park', 1e-2),
+])
+def test_surface_within_max_error(name, max_error):
+    exact = RULE_BASES[name].engine('exact')
+    surface = Surface.compile(exact, max_error)
+    inputs = sample(exact, 20000)
+
+    # error is checked at thirds of intervals, between them it may slightly exceed it
+    error = np.abs(surface.compute_batch(**inputs) - exact.compute_batch(**inputs))
+    assert error.max() < 1.5 * max_error
+
+
+def test_surface_scalar_matches_batch():
+    exact = RULE_BASES['turn_left_to_park'].engine('exact')
+    surface = Surface.compile(exact, 1e-2)
+    inputs = sample(exact, 100)
+    batch = surface.compute_batch(**inputs)
+    for i in range(len(batch)):
+        assert surface.compute(**{label: value[i] for label, value in inputs.items()}) == pytest.approx(batch[i])
+
+
+def test_surface_keeps_knots_of_engine():
+    exact = RULE_BASES['last_adjustment'].engine('exact')
+    surface = Surface.compile(exact, 1e-2)
+    for label, knots in exact.axes().items():
+        assert np.isin(knots, surface.axes()[label]).all()
@@ -0,0 +1,72 @@
+import pytest
+
+from remote_api import install
+
+NAMES = ['left_back', 'right_back']
+
+
+@pytest.fixture
+def remote_api(monkeypatch):
+    remote_api, tank = install(monkeypatch)
+    remote_api.objects = {'left_back': 1, 'right_back': 2}
+    remote_api.tank = tank
+    return remote_api
+
+
+def connected(remote_api, address=('127.0.0.1', 19999)):
+    # tank with client only, without sensors and first step of constructor
+    tank = remote_api.tank.Tank.__new__(remote_api.tank.Tank)
+    tank.address = address
+    tank.clientID = 1
+    return tank
+
+
+def test_handles_are_cached_by_scene_path(remote_api):
+    assert connected(remote_api).resolve_handles(NAMES, 'parking') == {'left_back': 1, 'right_back': 2}
+    remote_api.calls.clear()
+    assert connected(remote_api).resolve_handles(NAMES, 'parking') == {'left_back': 1, 'right_back': 2}
+    assert remote_api.lookups() == []
+
+
+def test_other_scene_path_is_resolved_again(remote_api):
+    connected(remote_api).resolve_handles(NAMES, 'parking')
+    remote_api.scene_path = 'other.ttt'
+    remote_api.objects = {'left_back': 3, 'right_back': 4}
+    remote_api.calls.clear()
+    assert connected(remote_api).resolve_handles(NAMES, 'parking') == {'left_back': 3, 'right_back': 4}
+    assert remote_api.lookups() == [('group',)]
+
+
+def test_other_address_is_resolved_again(remote_api):
+    connected(remote_api).resolve_handles(NAMES, 'parking')
+    remote_api.calls.clear()
+    connected(remote_api, ('127.0.0.1', 20000)).resolve_handles(NAMES, 'parking')
+    assert remote_api.lookups() == [('group',)]
+
+
+def test_without_scene_nothing_is_cached(remote_api):
+    connected(remote_api).resolve_handles(NAMES)
+    assert remote_api.tank.HANDLES == {}
+    assert ('path',) not in remote_api.calls
+
+
+def test_missing_objects_are_looked_up_one_by_one(remote_api):
+    remote_api.grouped = False
+    assert connected(remote_api).resolve_handles(NAMES, 'parking') == {'left_back': 1, 'right_back': 2}
+    assert remote_api.lookups() == [('group',), ('handle', 'left_back'), ('handle', 'right_back')]
+    assert len(remote_api.tank.HANDLES) == 1
+
+
+def test_failed_lookup_is_not_cached(remote_api):
+    remote_api.objects = {'left_back': 1}
+    connected(remote_api).resolve_handles(NAMES, 'parking')
+    assert remote_api.tank.HANDLES == {}
+
+
+def test_failed_path_query_is_not_cached(remote_api):
+    remote_api.scene_path = None
+    connected(remote_api).resolve_handles(NAMES, 'parking')
+    assert remote_api.tank.HANDLES == {}
+    remote_api.calls.clear()
+    connected(remote_api).resolve_handles(NAMES, 'parking')
+    assert remote_api.lookups() == [('group',)]
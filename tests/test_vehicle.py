@@ -0,0 +1,106 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from utils.simulator import SimulatedTank
+from utils.vehicle import COMMAND_OK, Distances, MAX_DISTANCE, Vehicle
+
+
+def distances():
+    return Distances(np.arange(16.0), timestamp=1.0)
+
+
+def test_readings_are_clamped_and_immutable():
+    d = distances()
+    assert d.values.max() == MAX_DISTANCE
+    with pytest.raises(AttributeError):
+        d.timestamp = 2.0
+    with pytest.raises(ValueError):
+        d.values[0] = 1.0
+
+
+def test_array_shares_values():
+    d = distances()
+    assert np.asarray(d) is d.values
+    assert np.array(d, copy=False) is d.values
+
+
+def test_array_copy():
+    d = distances()
+    copied = np.array(d, copy=True)
+    assert copied is not d.values
+    copied[0] = 5.0
+    assert d.values[0] == 0.0
+
+
+def test_array_dtype():
+    d = distances()
+    converted = np.asarray(d, dtype=np.float32)
+    assert converted.dtype == np.float32
+    np.testing.assert_array_equal(converted, d.values)
+    with pytest.raises(ValueError):
+        np.array(d, dtype=np.float32, copy=False)
+
+
+def test_pickle_and_copy():
+    d = distances()
+    for restored in (pickle.loads(pickle.dumps(d)), copy.copy(d), copy.deepcopy(d)):
+        assert isinstance(restored, Distances)
+        np.testing.assert_array_equal(restored.values, d.values)
+        assert restored.timestamp == d.timestamp
+        assert not restored.values.flags.writeable
+
+
+def test_unchanged_commands_are_suppressed():
+    tank = SimulatedTank()
+    assert tank._set_velocity(tank.left_back_handle, 1.0) == COMMAND_OK
+    assert tank._set_velocity(tank.left_back_handle, 1.0) == COMMAND_OK
+    assert tank.suppressed_commands == 1
+
+    tank.forget_commands()
+    tank._set_velocity(tank.left_back_handle, 1.0)
+    assert tank.suppressed_commands == 1
+
+
+def test_backend_hooks_are_abstract():
+    vehicle = Vehicle()
+    with pytest.raises(NotImplementedError, match='not implemented'):
+        vehicle._send_force(0, 1.0)
+    with pytest.raises(NotImplementedError, match='not implemented'):
+        vehicle._send_velocity(0, 1.0)
+    with pytest.raises(NotImplementedError, match='not implemented'):
+        vehicle.read_distances()
+
+
+class RecordingTank(SimulatedTank):
+
+    def __init__(self):
+        super().__init__()
+        self.paused = False
+        self.pauses = []
+        self.unbatched = []
+
+    def _pause(self, enable):
+        self.paused = enable
+        self.pauses.append(enable)
+
+    def _send_force(self, handle, force):
+        if not self.paused:
+            self.unbatched.append(handle)
+        return super()._send_force(handle, force)
+
+    def _send_velocity(self, handle, velocity):
+        if not self.paused:
+            self.unbatched.append(handle)
+        return super()._send_velocity(handle, velocity)
+
+
+@pytest.mark.parametrize('move', ['forward', 'backward', 'turn_left', 'turn_right',
+                                  'turn_left_circle', 'turn_right_circle'])
+def test_movement_is_one_batch(move):
+    tank = RecordingTank()
+    getattr(tank, move)(5)
+    assert tank.pauses == [True, False]
+    assert tank.unbatched == []
@@ -0,0 +1,62 @@
+from threading import Condition, Event, Thread
+
+
+class Slot:
+
+    # single-slot handoff, publishing replaces previous value, readers always get the
+    # newest one and only wait while nothing was published yet; failure of publisher
+    # is raised in readers
+
+    def __init__(self):
+        self._condition = Condition()
+        self._value = None
+        self._error = None
+        self.published = 0
+
+    def publish(self, value):
+        with self._condition:
+            self._value = value
+            self.published += 1
+            self._condition.notify_all()
+
+    def fail(self, error):
+        with self._condition:
+            self._error = error
+            self._condition.notify_all()
+
+    def take(self, timeout=None):
+        with self._condition:
+            ready = lambda: self._value is not None or self._error is not None
+            if not self._condition.wait_for(ready, timeout):
+                raise TimeoutError('nothing published yet')
+            if self._error is not None:
+                raise self._error
+            return self._value
+
+
+class Acquisition:
+
+    # daemon thread calling poll every interval seconds and publishing its result
+
+    def __init__(self, poll, interval):
+        self.slot = Slot()
+        self._poll = poll
+        self._interval = interval
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, name='acquisition', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                self.slot.publish(self._poll())
+                self._stopped.wait(self._interval)
+        except Exception as error:
+            self.slot.fail(error)
@@ -0,0 +1,76 @@
+import asyncio
+from functools import partial
+
+from utils.latency import ACTUATION
+
+
+class AsyncTank:
+
+    # Tank with awaitable sensor reads and actuation; blocking remote API calls run on
+    # executor, so their waits overlap with inference and with loops of other vehicles.
+    # Calls of one tank are still issued one after another
+
+    def __init__(self, tank, executor=None):
+        self.tank = tank
+        self._executor = executor
+
+    @classmethod
+    async def connect(cls, synchronous=False, grouped=False, scene=None, executor=None):
+        from utils.tank import Tank
+
+        tank = await asyncio.get_running_loop().run_in_executor(executor, partial(Tank, synchronous, grouped, scene))
+        return cls(tank, executor)
+
+    async def read_distances(self):
+        return await self.run(self.tank.read_distances)
+
+    async def step(self):
+        return await self.run(self.tank.step)
+
+    def time(self):
+        return self.tank.time()
+
+    def __getattr__(self, name):
+        # other attributes, like telemetry or commanded velocities, are read directly
+        value = getattr(self.tank, name)
+        if name not in ACTUATION:
+            return value
+
+        async def command(*args, **kwargs):
+            return await self.run(partial(value, *args, **kwargs))
+        return command
+
+    def run(self, call):
+        return asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+
+class Commands:
+
+    # stand-in for tank passed to stages by async controller, actuation commands are
+    # collected while stage runs and sent afterwards in one executor call
+
+    def __init__(self, tank):
+        self._tank = tank
+        self._commands = []
+
+    def time(self):
+        return self._tank.time()
+
+    def __getattr__(self, name):
+        if name not in ACTUATION:
+            raise AttributeError(name)
+        return partial(self._add, name)
+
+    def _add(self, name, *args, **kwargs):
+        self._commands.append((name, args, kwargs))
+
+    async def send(self):
+        commands, self._commands = self._commands, []
+        if commands:
+            await self._tank.run(partial(_send, self._tank.tank, commands))
+
+
+def _send(tank, commands):
+    with tank.batch():
+        for name, args, kwargs in commands:
+            getattr(tank, name)(*args, **kwargs)
@@ -0,0 +1,54 @@
+import asyncio
+
+from utils.schedule import Scheduler
+
+
+class Connections:
+
+    # simulators at several host:port addresses, each with its own client and tank;
+    # tanks are connected on first use and closed one by one or all together
+
+    def __init__(self, addresses, **tank_options):
+        self.addresses = [tuple(address) for address in addresses]
+        self._tank_options = tank_options
+        self._tanks = {}
+
+    def tank(self, address):
+        from utils.tank import Tank
+
+        address = tuple(address)
+        if address not in self.addresses:
+            raise KeyError(f'unknown simulator {address[0]}:{address[1]}')
+        if address not in self._tanks:
+            self._tanks[address] = Tank(address=address, **self._tank_options)
+        return self._tanks[address]
+
+    def tanks(self):
+        return [self.tank(address) for address in self.addresses]
+
+    def close(self, address):
+        tank = self._tanks.pop(tuple(address), None)
+        if tank is not None:
+            tank.close()
+
+    def close_all(self):
+        for address in list(self._tanks):
+            self.close(address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close_all()
+
+    async def run(self, controller, rate=None, executor=None):
+        # one episode of controller on every simulator at once, in one event loop
+        from utils.aio import AsyncTank
+
+        async def episode(tank):
+            tank = AsyncTank(tank, executor)
+            instance = controller(tank)
+            await tank.run(instance.warm_up)
+            return await Scheduler(rate).run_async(instance.control_async)
+
+        return await asyncio.gather(*(episode(tank) for tank in self.tanks()))
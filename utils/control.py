@@ -1,9 +1,12 @@
-from time import time
+from threading import Lock
+from time import perf_counter
 
-import matplotlib.pyplot as plt
-import numpy as np
+from utils.latency import Latency, TimedTank
+from utils.schedule import Scheduler
+from utils.telemetry import Telemetry
 
-from utils.tank import Tank
+# control ticks per second, None for as fast as possible
+RATE = 20
 
 
 class Controller:
@@ -11,69 +14,182 @@ class Controller:
     def __init__(self, tank, stages):
         self._tank = tank
         self._stages = [WaitSomeTime(0.1)] + stages
+        self.latency = None
+        self._startup = None
+
+        # ticks of all stages go to telemetry of tank, or of controller itself for tanks
+        # without one; stage id is position in controller. Empty telemetry is falsy, so
+        # it is checked against None
+        self.telemetry = getattr(tank, 'telemetry', None)
+        if self.telemetry is None:
+            self.telemetry = Telemetry()
+        self.telemetry.stages = [type(stage).__name__ for stage in self._stages]
+        for i, stage in enumerate(self._stages):
+            stage.telemetry = self.telemetry
+            stage.id = i
+
+    def record_latency(self):
+        # from now on every tick records durations of its phases per stage
+        self.latency = Latency()
+        self._tank = TimedTank(self._tank)
+        return self.latency
 
     def control(self):
         # immediate return if finished
         if not self._stages:
             return True
 
+        latency = self.latency
+        if latency is not None:
+            start = perf_counter()
+
         distances = self._tank.read_distances()
+
+        if latency is not None:
+            read = perf_counter()
+            self._tank.actuation = 0.0
+
+        # all commands of tick are applied by simulator at once
+        self._startup = None
+        with self._tank.batch():
+            current_stage = self._perform(self._tank, distances)
+
+            # finally, stop tank
+            if not self._stages:
+                self._tank.stop()
+
+        self.telemetry.record(distances, current_stage.id, self._tank.leftvelocity, self._tank.rightvelocity)
+
+        if latency is not None:
+            control = perf_counter()
+
+        # let synchronous simulation apply commands
+        self._tank.step()
+
+        if latency is not None:
+            actuation = self._tank.actuation
+            startup = self._startup or 0.0
+            latency.record(type(current_stage).__name__, read - start, control - read - actuation - startup,
+                           actuation, perf_counter() - control, self._startup)
+
+        return len(self._stages) == 0
+
+    async def control_async(self):
+        # same tick for AsyncTank, commands issued by stage are sent after it returns
+        from utils.aio import Commands
+
+        if not self._stages:
+            return True
+
+        distances = await self._tank.read_distances()
+
+        commands = Commands(self._tank)
+        current_stage = self._perform(commands, distances)
+        await commands.send()
+
+        if not self._stages:
+            await self._tank.stop()
+
+        self.telemetry.record(distances, current_stage.id, self._tank.leftvelocity, self._tank.rightvelocity)
+
+        await self._tank.step()
+
+        return len(self._stages) == 0
+
+    def _perform(self, tank, distances):
         current_stage = self._stages[0]
 
         # start stage
         if not current_stage.was_started:
-            current_stage.started(self._tank, distances)
+            # timed on its own, commands issued while starting are part of start-up
+            start = perf_counter()
+            actuation = getattr(tank, 'actuation', None)
+            current_stage.warm_up()
+            current_stage.reset()
+            current_stage.started(tank, distances)
             current_stage.was_started = True
+            if actuation is not None:
+                tank.actuation = actuation
+            self._startup = perf_counter() - start
 
         # perform current stage
-        stage_finished = current_stage.control(self._tank, distances)
-        current_stage.dist_history.append(distances)
+        stage_finished = current_stage.control(tank, distances)
 
         # remove stage if finished
         if stage_finished:
             self._stages.pop(0)
 
-        # finally, stop tank
-        if not self._stages:
-            self._tank.stop()
+        return current_stage
 
-        return len(self._stages) == 0
+    def warm_up(self):
+        for stage in self._stages:
+            stage.warm_up()
+
+
+class lazy:
+
+    # class attribute built once on first access, so stage models are only constructed
+    # when actually used; instances may shadow it with their own evaluation context.
+    # Build call and its arguments stay readable, e.g. for reports of stage models
+
+    def __init__(self, build, *args, **kwargs):
+        self.build = build
+        self.args = args
+        self.kwargs = kwargs
+        self._lock = Lock()
+        self._value = None
+
+    def __get__(self, instance, owner):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self.build(*self.args, **self.kwargs)
+        return self._value
 
 
 class Stage:
 
     def __init__(self):
         self.was_started = False
-        self.dist_history = []
         self.start = None
+        self.telemetry = None
+        self.id = None
 
     def started(self, tank, distances):
-        self.start = time()
+        self.start = tank.time()
+
+    def warm_up(self):
+        # build lazy models now, so that first tick of stage is not slow, and give
+        # this stage its own evaluation context of each, models stay shared read-only
+        for cls in type(self).__mro__:
+            for name, value in list(vars(cls).items()):
+                if isinstance(value, lazy) and name not in vars(self):
+                    setattr(self, name, getattr(type(self), name).context())
+
+    def reset(self):
+        # clear per-episode state of stage model
+        model = getattr(self, '_model', None)
+        if model is not None:
+            model.reset()
 
     def control(self, tank, distances):
         raise NotImplementedError('control method not implemented')
     
     def plot_history(self):
+        import matplotlib.pyplot as plt
+
         fig, axs = plt.subplots(4, 2)
-        x = np.arange(len(self.dist_history)) / 10
-
-        nw = [d.nw2 for d in self.dist_history]
-        ne = [d.ne2 for d in self.dist_history]
-        wn = [d.wn2 for d in self.dist_history]
-        en = [d.en2 for d in self.dist_history]
-        sw = [d.sw2 for d in self.dist_history]
-        se = [d.se2 for d in self.dist_history]
-        ws = [d.ws2 for d in self.dist_history]
-        es = [d.es2 for d in self.dist_history]
-
-        axs[0, 0].plot(x, nw, '-', label='nw')
-        axs[0, 1].plot(x, ne, '-', label='ne')
-        axs[1, 0].plot(x, wn, '-', label='wn')
-        axs[1, 1].plot(x, en, '-', label='en')
-        axs[2, 0].plot(x, sw, '--', label='sw')
-        axs[2, 1].plot(x, se, '--', label='se')
-        axs[3, 0].plot(x, ws, '--', label='ws')
-        axs[3, 1].plot(x, es, '--', label='es')
+        time, sensors = self.telemetry.sensors(self.id)
+        x = time - time[0] if len(time) else time
+
+        axs[0, 0].plot(x, sensors['nw2'], '-', label='nw')
+        axs[0, 1].plot(x, sensors['ne2'], '-', label='ne')
+        axs[1, 0].plot(x, sensors['wn2'], '-', label='wn')
+        axs[1, 1].plot(x, sensors['en2'], '-', label='en')
+        axs[2, 0].plot(x, sensors['sw2'], '--', label='sw')
+        axs[2, 1].plot(x, sensors['se2'], '--', label='se')
+        axs[3, 0].plot(x, sensors['ws2'], '--', label='ws')
+        axs[3, 1].plot(x, sensors['es2'], '--', label='es')
 
         for i in range(4):
             for j in range(2):
@@ -91,18 +207,54 @@ class WaitSomeTime(Stage):
         self.start_time = None
 
     def started(self, tank, distances):
-        self.start_time = time()
+        self.start_time = tank.time()
 
     def control(self, tank, distances):
         tank.stop()
-        return time() - self.start_time > self.duration
+        return tank.time() - self.start_time > self.duration
+
+
+def run_with_controller(controller, warm_up=True, rate=RATE, synchronous=False, latency=None, acquisition=False,
+                        grouped=False, scene=None):
+    # in synchronous mode every tick is one simulation step, with rate None
+    # simulation runs as fast as controller keeps up; latency is path where
+    # per stage tick latencies are exported after run; with acquisition sensors
+    # are polled by background thread; grouped reads all sensors in one reply;
+    # handles of named scene are resolved once per process
+    from utils.tank import Tank
+
+    tank = Tank(synchronous, grouped, scene)
+    try:
+        if acquisition:
+            tank.start_acquisition()
+        controller = controller(tank)
+        if warm_up:
+            controller.warm_up()
+        if latency is not None:
+            controller.record_latency()
+
+        scheduler = Scheduler(rate).run(controller.control)
+    finally:
+        # also when interrupted, so that acquisition thread and connection do not outlive run
+        tank.stop_acquisition()
+        tank.close()
+
+    if latency is not None:
+        controller.latency.export(latency)
+    return scheduler
 
 
-def run_with_controller(controller):
-    tank = Tank()
-    controller = controller(tank)
+async def run_with_controller_async(controller, warm_up=True, rate=RATE, synchronous=False, grouped=False,
+                                    scene=None, executor=None):
+    # one coroutine per vehicle or episode, many of them can share event loop and executor
+    from utils.aio import AsyncTank
 
-    finished = controller.control()
-    while not finished:
-        finished = controller.control()
+    tank = await AsyncTank.connect(synchronous, grouped, scene, executor)
+    try:
+        controller = controller(tank)
+        if warm_up:
+            await tank.run(controller.warm_up)
 
+        return await Scheduler(rate).run_async(controller.control_async)
+    finally:
+        await tank.run(tank.tank.close)
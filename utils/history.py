@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class RingBuffer:
+
+    # preallocated columns keeping only last `capacity` rows, capacity 0 disables recording
+
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self._names = list(columns)
+        self._arrays = [np.zeros(capacity) for _ in self._names]
+        self._index = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, *values):
+        if not self.capacity:
+            return
+        index = self._index
+        for array, value in zip(self._arrays, values):
+            array[index] = value
+        self._index = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        self._index = 0
+        self._size = 0
+
+    def __getitem__(self, name):
+        array = self._arrays[self._names.index(name)]
+        if self._size < self.capacity:
+            return array[:self._size].copy()
+        return np.concatenate([array[self._index:], array[:self._index]])
+
+
+class Recorder:
+
+    # columnar rows of structured dtype in preallocated chunks, growing by whole chunk
+    # when full, so recording never copies already recorded rows
+
+    CHUNK = 1024
+
+    def __init__(self, columns, chunk=CHUNK):
+        self.dtype = np.dtype(columns)
+        self._chunk = chunk
+        self._chunks = []
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return len(self._chunks) * self._chunk * self.dtype.itemsize
+
+    def append(self, *values):
+        chunk, index = divmod(self._size, self._chunk)
+        if chunk == len(self._chunks):
+            self._chunks.append(np.zeros(self._chunk, self.dtype))
+        self._chunks[chunk][index] = values
+        self._size += 1
+
+    def clear(self):
+        self._chunks.clear()
+        self._size = 0
+
+    def rows(self):
+        if not self._chunks:
+            return np.zeros(0, self.dtype)
+        return np.concatenate(self._chunks)[:self._size]
+
+    def __getitem__(self, name):
+        return self.rows()[name]
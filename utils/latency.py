@@ -0,0 +1,101 @@
+import json
+import math
+from time import perf_counter
+
+# start-up of stage, on its first tick only, is kept apart from control of the stage
+PHASES = ['read', 'control', 'actuation', 'step', 'startup']
+ACTUATION = ['stop', 'go', 'forward', 'backward', 'turn_left', 'turn_right', 'turn_left_circle', 'turn_right_circle']
+
+# log-spaced histogram bins from 1 us up to 10 s
+MIN_LATENCY = 1e-6
+BINS_PER_DECADE = 20
+BINS = 7 * BINS_PER_DECADE + 1
+
+
+class Latency:
+
+    # per stage histograms of tick phase durations; bins are log-spaced, so recording
+    # is constant time and memory, and percentiles are exact up to bin width (~12%)
+
+    def __init__(self):
+        self._histograms = {}
+
+    def record(self, stage, *durations):
+        histograms = self._histograms.get(stage)
+        if histograms is None:
+            histograms = self._histograms[stage] = [[0] * BINS for _ in PHASES]
+        for histogram, duration in zip(histograms, durations):
+            if duration is not None:
+                histogram[_bin(duration)] += 1
+
+    def percentile(self, stage, phase, q):
+        histogram = self._histograms[stage][PHASES.index(phase)]
+        rank = q / 100 * sum(histogram)
+        count = 0
+        for i, n in enumerate(histogram):
+            count += n
+            if count >= rank and count:
+                return _upper_edge(i)
+        return math.nan
+
+    def summary(self):
+        return {
+            stage: {
+                phase: {
+                    'count': sum(histograms[i]),
+                    'p50': self.percentile(stage, phase, 50),
+                    'p95': self.percentile(stage, phase, 95),
+                    'p99': self.percentile(stage, phase, 99),
+                }
+                for i, phase in enumerate(PHASES)
+            }
+            for stage, histograms in self._histograms.items()
+        }
+
+    def export(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def __repr__(self):
+        lines = []
+        for stage, phases in self.summary().items():
+            lines.append(stage)
+            for phase, stats in phases.items():
+                if not stats['count']:
+                    continue
+                lines.append(f'  {phase:<10} p50 {stats["p50"] * 1000:8.3f} ms  p95 {stats["p95"] * 1000:8.3f} ms  '
+                             f'p99 {stats["p99"] * 1000:8.3f} ms  ({stats["count"]} ticks)')
+        return '\n'.join(lines)
+
+
+class TimedTank:
+
+    # tank seen by stages while latency is recorded, time spent in actuation commands
+    # is summed up so that it can be told apart from stage logic
+
+    def __init__(self, tank):
+        self._tank = tank
+        self.actuation = 0.0
+
+    def __getattr__(self, name):
+        value = getattr(self._tank, name)
+        if name not in ACTUATION:
+            return value
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return value(*args, **kwargs)
+            finally:
+                self.actuation += perf_counter() - start
+        return timed
+
+
+def _bin(duration):
+    if duration <= MIN_LATENCY:
+        return 0
+    return min(int(math.log10(duration / MIN_LATENCY) * BINS_PER_DECADE) + 1, BINS - 1)
+
+
+def _upper_edge(i):
+    return MIN_LATENCY * 10 ** (i / BINS_PER_DECADE)
@@ -0,0 +1,64 @@
+import asyncio
+import math
+import time
+
+
+class Scheduler:
+
+    # calls step at fixed rate until it returns True; deadlines are counted from start,
+    # not from end of previous tick, so sleeping errors do not accumulate. Tick running
+    # past its deadline is an overrun, and periods that passed meanwhile are missed, they
+    # are skipped rather than caught up. Rate None runs as fast as possible, e.g. for
+    # offline backends
+
+    def __init__(self, rate=None, clock=time.perf_counter, sleep=time.sleep):
+        self.rate = rate
+        self.period = 1 / rate if rate else 0
+        self._clock = clock
+        self._sleep = sleep
+        self.ticks = 0
+        self.overruns = 0
+        self.missed = 0
+        self._deadline = None
+
+    def run(self, step):
+        self._deadline = self._clock()
+        finished = False
+        while not finished:
+            finished = step()
+            delay = self._tick(finished)
+            if delay is not None:
+                self._sleep(delay)
+        return self
+
+    async def run_async(self, step):
+        # same for coroutine step, waiting lets other loops run meanwhile
+        self._deadline = self._clock()
+        finished = False
+        while not finished:
+            finished = await step()
+            delay = self._tick(finished)
+            if delay is not None:
+                await asyncio.sleep(delay)
+        return self
+
+    def _tick(self, finished):
+        # counts tick and returns how long to wait before next one
+        self.ticks += 1
+        if not self.period:
+            return None
+
+        # deadline of this tick, and start of the next one; last tick counts too
+        self._deadline += self.period
+        now = self._clock()
+        if now > self._deadline:
+            self.overruns += 1
+            skipped = math.ceil((now - self._deadline) / self.period)
+            self.missed += skipped
+            self._deadline += skipped * self.period
+
+        return None if finished else self._deadline - now
+
+    def __repr__(self):
+        rate = f'{self.rate:g} Hz' if self.rate else 'as fast as possible'
+        return f'{self.ticks} ticks at {rate}, {self.overruns} overruns, {self.missed} missed deadlines'
@@ -0,0 +1,256 @@
+import math
+from functools import partial
+from threading import RLock
+
+import numpy as np
+
+from utils.schedule import Scheduler
+from utils.vehicle import COMMAND_OK, Distances, MAX_DISTANCE, Vehicle
+
+# seconds of simulation advanced by every step, same as control period of RATE
+DT = 0.05
+
+# tank body and drive, in meters; tracks slip while turning, so effective track is
+# wider than body
+LENGTH = 1.0
+WIDTH = 0.6
+WHEEL_RADIUS = 0.05
+TRACK = 2.0
+
+# proximity sensors see nearest point in cone, approximated by fan of rays
+CONE = math.radians(30)
+RAYS = 7
+
+# sensor name: first letter is direction it faces, second the side of body it sits on;
+# body frame has x forward and y to the left
+PROXIMITY_SENSORS = {
+    'EN': (LENGTH / 2, -WIDTH / 2, -math.pi / 2),
+    'ES': (-LENGTH / 2, -WIDTH / 2, -math.pi / 2),
+    'NE': (LENGTH / 2, -WIDTH / 2, 0),
+    'NW': (LENGTH / 2, WIDTH / 2, 0),
+    'SE': (-LENGTH / 2, -WIDTH / 2, math.pi),
+    'SW': (-LENGTH / 2, WIDTH / 2, math.pi),
+    'WN': (LENGTH / 2, WIDTH / 2, math.pi / 2),
+    'WS': (-LENGTH / 2, WIDTH / 2, math.pi / 2),
+}
+
+# episodes not finished after this many ticks are given up, about three times the
+# longest nominal episode, perpendicular parking of 1688 ticks
+MAX_TICKS = 5000
+
+
+class Scene:
+
+    # 2-D parking lot, walls are segments (x1, y1, x2, y2) and obstacles like parked cars
+    # are boxes; tank starts at pose (x, y, heading), heading is counterclockwise from x
+
+    def __init__(self, name, start, walls=(), boxes=()):
+        self.name = name
+        self.start = start
+        segments = list(walls)
+        for box in boxes:
+            segments.extend(_box(*box))
+        self.segments = np.array(segments, dtype=float).reshape(-1, 4)
+
+    def __repr__(self):
+        return f'Scene({self.name!r}, {len(self.segments)} segments)'
+
+
+def _box(x, y, width, length):
+    # axis aligned box with center x, y
+    x1, x2 = x - width / 2, x + width / 2
+    y1, y2 = y - length / 2, y + length / 2
+    return [(x1, y1, x2, y1), (x2, y1, x2, y2), (x2, y2, x1, y2), (x1, y2, x1, y1)]
+
+
+# layouts only approximate scenes of CoppeliaSim, they are not part of repository
+
+# tank drives north along row of perpendicular bays on its left up to wall closing the
+# lot, free bay is the last one, next to the wall
+PERPENDICULAR = Scene(
+    'perpendicular',
+    start=(0, 0, math.pi / 2),
+    walls=[(3, 9, -2, 9), (-2, 9, -2, 7.9), (-2, 7.9, -8, 7.9), (1.5, -2, 1.5, 9)],
+    boxes=[(-3.1, y, 2.2, 1.0) for y in (5.6, 4.4, 3.2, 2.0)],
+)
+
+# tank drives north past cars parked along right side of street, free space is between
+# two of them; curb is too low for sensors, other side of street is a wall
+PARALLEL = Scene(
+    'parallel',
+    start=(0, 0, math.pi / 2),
+    walls=[(-3, -5, -3, 20)],
+    boxes=[(1.45, 2.3, 0.7, 1.4), (1.45, 6.7, 0.7, 1.4)],
+)
+
+
+class SimulatedTank(Vehicle):
+
+    # tank driven in process instead of CoppeliaSim, skid-steer kinematics are integrated
+    # from target velocities of rear drive joints and proximity sensors are ray-cast
+    # against walls of scene; every step advances simulation time by DT, so episodes run
+    # as fast as controller keeps up
+
+    def __init__(self, scene=PERPENDICULAR, pose=None, dt=DT):
+        super().__init__()
+        self.scene = scene
+        self.dt = dt
+        self.pose = tuple(scene.start if pose is None else pose)
+        self.ticks = 0
+        self.collisions = 0
+        self.finished = False
+
+        # joints are known by name, their commands are kept like simulator keeps them
+        self.proximity_sensors = list(PROXIMITY_SENSORS)
+        self.left_front_handle = 'left_front'
+        self.left_back_handle = 'left_back'
+        self.right_back_handle = 'right_back'
+        self.right_front_handle = 'right_front'
+        self.side_handles = ['sj_'+l+'_'+str(i) for l in 'rl' for i in range(1,7)]
+        self.joint_forces = {}
+        self.joint_velocities = {}
+
+        # rays of all sensors, sensor after sensor, followed by edges of body outline, so
+        # that sensing and collision checking is one cast; all in body frame
+        spread = np.linspace(-CONE / 2, CONE / 2, RAYS)
+        sensors = np.array(list(PROXIMITY_SENSORS.values()))
+        angles = (sensors[:, 2:] + spread).ravel()
+        corners = np.array([(1, 1), (1, -1), (-1, -1), (-1, 1)]) * (LENGTH / 2, WIDTH / 2)
+        self._origins = np.vstack((np.repeat(sensors[:, :2], RAYS, axis=0), corners))
+        self._directions = np.vstack((np.column_stack((np.cos(angles), np.sin(angles))),
+                                      np.roll(corners, -1, axis=0) - corners))
+        self._limits = np.concatenate((np.full(len(angles), MAX_DISTANCE), np.ones(len(corners))))
+        self._rays = len(angles)
+        self._readings = np.zeros(2 * len(PROXIMITY_SENSORS))
+        self._hits = None
+
+        # pose and hits cast from it change together, also with acquisition thread polling
+        self._lock = RLock()
+
+    def _send_force(self, handle, force):
+        self.joint_forces[handle] = force
+        return COMMAND_OK
+
+    def _send_velocity(self, handle, velocity):
+        self.joint_velocities[handle] = velocity
+        return COMMAND_OK
+
+    def _track(self, handle):
+        # track only moves while its drive joint has force, otherwise it is braked
+        if not self.joint_forces.get(handle):
+            return 0.0
+        return WHEEL_RADIUS * self.joint_velocities.get(handle, 0.0)
+
+    def step(self):
+        left = self._track(self.left_back_handle)
+        right = self._track(self.right_back_handle)
+        velocity = (left + right) / 2
+        rotation = (right - left) / TRACK
+
+        with self._lock:
+            x, y, heading = self.pose
+            middle = heading + rotation * self.dt / 2
+            self.pose = (x + velocity * math.cos(middle) * self.dt,
+                         y + velocity * math.sin(middle) * self.dt,
+                         heading + rotation * self.dt)
+            self.ticks += 1
+            self._hits = None
+
+            if self.collided():
+                self.collisions += 1
+
+    def time(self):
+        return self.ticks * self.dt
+
+    def _cast(self):
+        # rays and body edges of current pose, cast once per step
+        with self._lock:
+            if self._hits is None:
+                x, y, heading = self.pose
+                cos, sin = math.cos(heading), math.sin(heading)
+                rotation = np.array(((cos, sin), (-sin, cos)))
+                self._hits = _cast(self._origins @ rotation + (x, y), self._directions @ rotation,
+                                   self.scene.segments, self._limits)
+            return self._hits
+
+    def _poll_distances(self):
+        with self._lock:
+            timestamp = self.time()
+
+            # nearest point in cone of every sensor, both readings are the same as there
+            # is no stale detection here
+            distance = self._cast()[:self._rays].reshape(len(PROXIMITY_SENSORS), RAYS).min(axis=1)
+            self._readings[0::2] = distance
+            self._readings[1::2] = distance
+            return Distances(self._readings, timestamp=timestamp)
+
+    def collided(self):
+        return bool(np.isfinite(self._cast()[self._rays:]).any())
+
+
+def _cast(origins, directions, segments, limits):
+    # distance along every ray to nearest segment, in units of its direction, inf if
+    # nothing is hit within limit of ray
+    start = segments[:, :2]
+    edge = segments[:, 2:] - start
+    offset = start - origins[:, None, :]
+    dx, dy = directions[:, 0, None], directions[:, 1, None]
+
+    denominator = dx * edge[:, 1] - dy * edge[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (offset[..., 0] * edge[:, 1] - offset[..., 1] * edge[:, 0]) / denominator
+        u = (offset[..., 0] * dy - offset[..., 1] * dx) / denominator
+
+    hit = (t >= 0) & (t <= limits[:, None]) & (u >= 0) & (u <= 1)
+    return np.where(hit, t, math.inf).min(axis=1, initial=math.inf)
+
+
+def simulate(controller, scene=PERPENDICULAR, pose=None, warm_up=True, max_ticks=MAX_TICKS):
+    # runs one episode as fast as possible, returns tank with its telemetry, final pose
+    # and whether controller finished
+    tank = SimulatedTank(scene, pose)
+    controller = controller(tank)
+    if warm_up:
+        controller.warm_up()
+
+    def step():
+        tank.finished = controller.control()
+        return tank.finished or tank.ticks >= max_ticks
+
+    Scheduler(None).run(step)
+    return tank
+
+
+def simulate_many(controller, scene=PERPENDICULAR, episodes=100, jitter=0.02, seed=None, max_ticks=MAX_TICKS,
+                  executor=None):
+    # episodes start from randomly disturbed start pose of scene, with process pool as
+    # executor they run in parallel
+    rng = np.random.default_rng(seed)
+    poses = [tuple(np.asarray(scene.start) + rng.normal(0, jitter, 3) * (1, 1, 0.1)) for _ in range(episodes)]
+    episode = partial(simulate, controller, scene, max_ticks=max_ticks)
+    if executor is None:
+        return [episode(pose) for pose in poses]
+    return list(executor.map(episode, poses))
+
+
+if __name__ == '__main__':
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from time import perf_counter
+
+    from park import ParaParkController, PerpParkController
+
+    workers = os.cpu_count()
+    executor = ProcessPoolExecutor(workers)
+    for controller, scene in [(PerpParkController, PERPENDICULAR), (ParaParkController, PARALLEL)]:
+        # first episodes of every process build models
+        simulate_many(controller, scene, episodes=workers, executor=executor)
+        start = perf_counter()
+        tanks = simulate_many(controller, scene, episodes=100, seed=0, executor=executor)
+        elapsed = perf_counter() - start
+
+        finished = sum(tank.finished for tank in tanks)
+        collided = sum(tank.collisions > 0 for tank in tanks)
+        ticks = sum(tank.ticks for tank in tanks) / len(tanks)
+        print(f'{controller.__name__} in {scene.name} scene: {len(tanks) / elapsed * 60:.0f} episodes/min, '
+              f'{finished} finished, {collided} collided, {ticks:.0f} ticks on average')
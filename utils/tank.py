@@ -1,238 +1,141 @@
-import sys
 import math
+import time
 from api import vrep
 import numpy as np
-import matplotlib.pyplot as plt
 
+from utils.vehicle import Distances, Vehicle
 
-class Distances:
+# object handles of already seen scenes, by simulator address, scene name and path of
+# scene file open in simulator
+HANDLES = {}
 
-    def __init__(self, en, en2, es, es2, ne, ne2, nw, nw2, se, se2, sw, sw2, wn, wn2, ws, ws2):
-        self.en = min(en, 6)
-        self.es = min(es, 6)
-        self.ne = min(ne, 6)
-        self.nw = min(nw, 6)
-        self.se = min(se, 6)
-        self.sw = min(sw, 6)
-        self.wn = min(wn, 6)
-        self.ws = min(ws, 6)
+# remote API server of simulator
+ADDRESS = ('127.0.0.1', 19999)
 
-        self.en2 = min(en2, 6)
-        self.es2 = min(es2, 6)
-        self.ne2 = min(ne2, 6)
-        self.nw2 = min(nw2, 6)
-        self.se2 = min(se2, 6)
-        self.sw2 = min(sw2, 6)
-        self.wn2 = min(wn2, 6)
-        self.ws2 = min(ws2, 6)
 
-    def __repr__(self):
-        return f'NW:{self.nw:.2f} NE:{self.ne:.2f} WN:{self.wn:.2f} EN:{self.en:.2f} | SW:{self.sw:.2f} SE:{self.se:.2f} WS:{self.ws:.2f} ES:{self.es:.2f}'
-
-
-class Tank:
-    def __init__(self):
+class Tank(Vehicle):
+    def __init__(self, synchronous=False, grouped=False, scene=None, address=ADDRESS):
+        super().__init__()
+        self.address = tuple(address)
         self.clientID = self.connect()
-        # get handles to robot drivers
-        err_code, self.left_front_handle =  vrep.simxGetObjectHandle(self.clientID,'left_front', vrep.simx_opmode_blocking)
-        err_code, self.left_back_handle  =  vrep.simxGetObjectHandle(self.clientID,'left_back', vrep.simx_opmode_blocking)
-        err_code, self.right_back_handle =  vrep.simxGetObjectHandle(self.clientID,'right_back', vrep.simx_opmode_blocking)
-        err_code, self.right_front_handle=  vrep.simxGetObjectHandle(self.clientID,'right_front', vrep.simx_opmode_blocking)
-        
-        self.side_handles=[]
-        for l in 'rl':
-            for i in range(1,7):
-                err_code, handle=  vrep.simxGetObjectHandle(self.clientID,'sj_'+l+'_'+str(i) , vrep.simx_opmode_blocking)
-                self.side_handles.append(handle)
-       
-        #initial velocity
-        self.leftvelocity=0
-        self.rightvelocity=0
-        self.MaxVel=10
-        self.dVel=1
+        self.synchronous = synchronous
+        if synchronous:
+            # simulator waits for trigger before every step
+            vrep.simxSynchronous(self.clientID, True)
+            vrep.simxStartSimulation(self.clientID, vrep.simx_opmode_blocking)
 
         # proximity
         self.proximity_sensors = ["EN", "ES", "NE", "NW", "SE", "SW", "WN", "WS"]
-        self.proximity_sensors_handles = [0] * 8
 
-        # get handle to proximity sensors
-        for i in range(len(self.proximity_sensors)):
-            err_code, self.proximity_sensors_handles[i] = vrep.simxGetObjectHandle(
-                self.clientID, "Proximity_sensor_" + self.proximity_sensors[i], vrep.simx_opmode_blocking)
+        side_joints = ['sj_'+l+'_'+str(i) for l in 'rl' for i in range(1,7)]
+        sensors = ["Proximity_sensor_" + name for name in self.proximity_sensors]
+        handles = self.resolve_handles(['left_front', 'left_back', 'right_back', 'right_front'] + side_joints + sensors, scene)
 
-        # proximity sensors initialization
-        for sensor_name, sensor_handle in zip(self.proximity_sensors, self.proximity_sensors_handles):
-            err_code, detectionState, detectedPoint, detectedObjectHandle, detectedSurfaceNormalVector = vrep.simxReadProximitySensor(
-                self.clientID, sensor_handle, vrep.simx_opmode_streaming)
+        # get handles to robot drivers
+        self.left_front_handle = handles['left_front']
+        self.left_back_handle = handles['left_back']
+        self.right_back_handle = handles['right_back']
+        self.right_front_handle = handles['right_front']
+        self.side_handles = [handles[name] for name in side_joints]
 
-        self.distances_history = []
+        # get handle to proximity sensors
+        self.proximity_sensors_handles = [handles[name] for name in sensors]
+
+        # proximity sensors initialization, buffers of reader and of distance computation
+        # are reused by every read; grouped reader gets all sensors in one reply
+        self._proximity = vrep.ProximitySensorReader(self.clientID, self.proximity_sensors_handles, grouped)
+        self._proximity.read(vrep.simx_opmode_streaming)
+        self._norms = np.zeros(len(self.proximity_sensors))
+        self._valid = np.zeros(len(self.proximity_sensors), dtype=bool)
+        self._succeeded = np.zeros(len(self.proximity_sensors), dtype=bool)
+        self._readings = np.zeros(2 * len(self.proximity_sensors))
+
+        # first step fills buffers of streamed sensors
+        self.step()
+
+    def resolve_handles(self, names, scene=None):
+        # handles of all scene objects come in one query of their names, only objects
+        # missing there are looked up one by one; with scene name given they are cached
+        # by scene file open in simulator, so later connections to the same scene skip
+        # lookup entirely, and never cached when any lookup failed
+        key = None
+        if scene is not None:
+            err_code, path = vrep.simxGetStringParameter(
+                self.clientID, vrep.sim_stringparam_scene_path_and_name, vrep.simx_opmode_blocking)
+            if err_code == vrep.simx_return_ok:
+                key = self.address, scene, path
+        if key in HANDLES:
+            return HANDLES[key]
+
+        err_code, handles, _, _, object_names = vrep.simxGetObjectGroupData(
+            self.clientID, vrep.sim_appobj_object_type, 0, vrep.simx_opmode_blocking)
+        found = dict(zip(object_names, handles)) if err_code == vrep.simx_return_ok else {}
+
+        resolved = {}
+        for name in names:
+            if name not in found:
+                err_code, found[name] = vrep.simxGetObjectHandle(self.clientID, name, vrep.simx_opmode_blocking)
+                if err_code != vrep.simx_return_ok:
+                    key = None
+            resolved[name] = found[name]
+
+        if key is not None:
+            HANDLES[key] = resolved
+        return resolved
 
     def connect(self):
-        vrep.simxFinish(-1)
-        client_id = vrep.simxStart('127.0.0.1', 19999, True, True, 5000, 5)
+        # only this tank's own connection, other clients of process stay connected
+        host, port = self.address
+        client_id = vrep.simxStart(host, port, True, True, 5000, 5)
 
         if client_id != -1:
-            print("Connected to remote API server")
+            print(f"Connected to remote API server {host}:{port}")
         else:
-            print("Not connected to remote API server")
-            sys.exit("Could not connect")
+            print(f"Not connected to remote API server {host}:{port}")
+            raise ConnectionError(f'could not connect to {host}:{port}')
 
         return client_id
 
-    def stop(self):
-        #set divers to stop mode
-        force =0
-        err_code = vrep.simxSetJointForce(self.clientID, self.left_front_handle, force, vrep.simx_opmode_oneshot)
-        err_code = vrep.simxSetJointForce(self.clientID, self.left_back_handle, force, vrep.simx_opmode_oneshot)
-        err_code = vrep.simxSetJointForce(self.clientID, self.right_back_handle, force, vrep.simx_opmode_oneshot)
-        err_code = vrep.simxSetJointForce(self.clientID, self.right_front_handle, force, vrep.simx_opmode_oneshot)
-        
-        force =10
-        for h in self.side_handles:
-            err_code = vrep.simxSetJointForce(self.clientID, h, force, vrep.simx_opmode_oneshot)
-        
-        #break
-        self.leftvelocity=10
-        self.rightvelocity=10
-        vrep.simxSetJointTargetVelocity(self.clientID,self.left_front_handle,self.leftvelocity,vrep.simx_opmode_streaming)
-        vrep.simxSetJointTargetVelocity(self.clientID,self.left_back_handle,self.leftvelocity,vrep.simx_opmode_streaming)
-        vrep.simxSetJointTargetVelocity(self.clientID,self.right_back_handle,self.rightvelocity,vrep.simx_opmode_streaming)
-        vrep.simxSetJointTargetVelocity(self.clientID,self.right_front_handle,self.rightvelocity,vrep.simx_opmode_streaming)
-    
-    def go(self):
-        #set divers to go mode
-        force =10
-        err_code = vrep.simxSetJointForce(self.clientID, self.left_front_handle, force, vrep.simx_opmode_oneshot)
-        err_code = vrep.simxSetJointForce(self.clientID, self.left_back_handle, force, vrep.simx_opmode_oneshot)
-        err_code = vrep.simxSetJointForce(self.clientID, self.right_back_handle, force, vrep.simx_opmode_oneshot)
-        err_code = vrep.simxSetJointForce(self.clientID, self.right_front_handle, force, vrep.simx_opmode_oneshot)
-        
-        force =0
-        for h in self.side_handles:
-            err_code = vrep.simxSetJointForce(self.clientID, h, force, vrep.simx_opmode_oneshot)
-    
-    def setVelocity(self):
-        #verify if the velocity is in correct range
-        if self.leftvelocity > self.MaxVel:
-            self.leftvelocity = self.MaxVel
-        if self.leftvelocity < -self.MaxVel:
-            self.leftvelocity = -self.MaxVel
-        if self.rightvelocity > self.MaxVel:
-            self.rightvelocity = self.MaxVel
-        if self.rightvelocity < -self.MaxVel:
-            self.rightvelocity = -self.MaxVel
-        
-        #send value of velocity to drivers
-        #vrep.simxSetJointTargetVelocity(clientID,left_front_handle,leftvelocity,vrep.simx_opmode_streaming)
-        vrep.simxSetJointTargetVelocity(self.clientID,self.left_back_handle,self.leftvelocity,vrep.simx_opmode_streaming)
-        vrep.simxSetJointTargetVelocity(self.clientID,self.right_back_handle,self.rightvelocity,vrep.simx_opmode_streaming)
-        #vrep.simxSetJointTargetVelocity(clientID,right_front_handle,rightvelocity,vrep.simx_opmode_streaming)
-    
-    #Move the tank forward
-    #None - increases velocity by 1, if velocities of wheels are different they are equalized 
-    #velocity - takes values from <-10,10> and sets them as velocity for both wheels in forward direction
-    def forward(self, velocity=None):
-        self.go()
-        if velocity!=None:
-            self.leftvelocity=velocity
-            self.rightvelocity=velocity
-        else:
-            self.rightvelocity=self.leftvelocity=(self.leftvelocity+self.rightvelocity)/2
-            self.leftvelocity+=self.dVel
-            self.rightvelocity+=self.dVel
-        self.setVelocity()
-    
-    #Move the tank backward 
-    #None - decreases velocity by 1, if velocities of wheels are different they are equalized 
-    #velocity - takes values from <-10,10> and sets them as velocity for both wheels in backward direction
-    def backward(self, velocity=None):
-        self.go()
-        if velocity!=None:
-            self.leftvelocity=-velocity
-            self.rightvelocity=-velocity
-        else:
-            self.rightvelocity=self.leftvelocity=(self.leftvelocity+self.rightvelocity)/2
-            self.leftvelocity-=self.dVel
-            self.rightvelocity-=self.dVel
-        self.setVelocity()
-    
-    #Turns left the tank 
-    #None - increases velocity of rightwheel by 1, decreases velocity of leftwheel by 1 
-    #velocity - takes values from <-10,10> and sets it as velocity for right wheel 
-        #in forward direction and oposite value of velocity for left wheel in backward direction
-    def turn_left(self, velocity=None):
-        self.go()
-        if velocity!=None:
-            self.leftvelocity =-velocity
-            self.rightvelocity= velocity
-        else:
-            self.leftvelocity -=self.dVel
-            self.rightvelocity+=self.dVel
-        self.setVelocity()
-
-    def turn_left_circle(self, velocity):
-        self.go()
-        self.leftvelocity = 10 * (velocity / 10)
-        self.rightvelocity = 3 * (velocity / 10)
-        self.setVelocity()
-
-
-    def turn_right_circle(self, velocity):
-        self.go()
-        self.rightvelocity = 10 * (velocity / 10)
-        self.leftvelocity = 3 * (velocity / 10)
-        self.setVelocity()
-    
-    #Turns right the tank 
-    #None - increases velocity of leftwheel by 1, decreases velocity of rightwheel by 1 
-    #velocity - takes values from <-10,10> and sets it as velocity for left wheel 
-        #in forward direction and oposite value of velocity for right wheel in backward direction
-    def turn_right(self, velocity=None):
-        self.go()
-        if velocity!=None:
-            self.leftvelocity = velocity
-            self.rightvelocity=-velocity
-        else:
-            self.leftvelocity +=self.dVel
-            self.rightvelocity-=self.dVel
-        self.setVelocity()
-
-    def read_distances(self):
-        distances = []
-        for sensor_name, sensor_handle in zip(self.proximity_sensors, self.proximity_sensors_handles):
-            err_code, detectionState, detectedPoint, detectedObjectHandle, detectedSurfaceNormalVector = vrep.simxReadProximitySensor(self.clientID, sensor_handle, vrep.simx_opmode_buffer)
-            norm = np.linalg.norm(detectedPoint)
-            distance = norm if err_code == 0 and norm > 1e-2 else math.inf
-            distance2 = distance if detectionState else math.inf
-            distances.extend([distance, distance2])
-
-        distances = Distances(*distances)
-        self.distances_history.append(distances)
-        return distances
-
-    def restart_plot(self):
-        self.distances_history.clear()
-
-    def plot_distances(self):
-        x = np.arange(len(self.distances_history)) / 10
-
-        nw = [d.nw for d in self.distances_history]
-        ne = [d.ne for d in self.distances_history]
-        wn = [d.wn for d in self.distances_history]
-        en = [d.en for d in self.distances_history]
-        sw = [d.sw for d in self.distances_history]
-        se = [d.se for d in self.distances_history]
-        ws = [d.ws for d in self.distances_history]
-        es = [d.es for d in self.distances_history]
-
-        plt.plot(x, nw, '-', label='nw')
-        plt.plot(x, ne, '-', label='ne')
-        plt.plot(x, wn, '-', label='wn')
-        plt.plot(x, en, '-', label='en')
-        plt.plot(x, sw, '--', label='sw')
-        plt.plot(x, se, '--', label='se')
-        plt.plot(x, ws, '--', label='ws')
-        plt.plot(x, es, '--', label='es')
-
-        plt.legend()
-        plt.show()
+    def close(self):
+        super().close()
+        vrep.simxFinish(self.clientID)
+
+    def _pause(self, enable):
+        vrep.simxPauseCommunication(self.clientID, enable)
+
+    def _send_force(self, handle, force):
+        return vrep.simxSetJointForce(self.clientID, handle, force, vrep.simx_opmode_oneshot)
+
+    def _send_velocity(self, handle, velocity):
+        return vrep.simxSetJointTargetVelocity(self.clientID, handle, velocity, vrep.simx_opmode_streaming)
+
+    def step(self):
+        # in synchronous mode advance simulation by exactly one step and wait until
+        # it is done, so that next read sees sensors of that step
+        if self.synchronous:
+            vrep.simxSynchronousTrigger(self.clientID)
+            vrep.simxGetPingTime(self.clientID)
+
+    def time(self):
+        # simulation time in synchronous mode, runs may be faster than real time there
+        if self.synchronous:
+            return vrep.simxGetLastCmdTime(self.clientID) / 1000
+        return time.time()
+
+    def _poll_distances(self):
+        timestamp = self.time()
+        err_codes, detected, points = self._proximity.read(vrep.simx_opmode_buffer)
+
+        norms = np.einsum('ij,ij->i', points, points, dtype=float, out=self._norms)
+        np.sqrt(norms, out=norms)
+        np.greater(norms, 1e-2, out=self._valid)
+        np.logical_and(self._valid, np.equal(err_codes, 0, out=self._succeeded), out=self._valid)
+
+        # readings interleave distance and distance to detected object of every sensor
+        distance, distance2 = self._readings[0::2], self._readings[1::2]
+        distance.fill(math.inf)
+        np.copyto(distance, norms, where=self._valid)
+        distance2.fill(math.inf)
+        np.copyto(distance2, distance, where=detected)
+
+        return Distances(self._readings, timestamp=timestamp)
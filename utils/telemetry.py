@@ -0,0 +1,30 @@
+from utils.history import Recorder
+
+# sensor columns in order of Distances arguments
+SENSORS = ['en', 'en2', 'es', 'es2', 'ne', 'ne2', 'nw', 'nw2', 'se', 'se2', 'sw', 'sw2', 'wn', 'wn2', 'ws', 'ws2']
+
+
+class Telemetry(Recorder):
+
+    # one row per control tick: time of sensor reading, stage, all sensors and
+    # commanded wheel velocities; 82 bytes per row, so 1.6 KB/s at 20 Hz
+
+    def __init__(self, chunk=Recorder.CHUNK):
+        super().__init__([
+            ('time', 'f8'),
+            ('stage', 'i2'),
+            ('sensors', 'f4', len(SENSORS)),
+            ('left', 'f4'),
+            ('right', 'f4'),
+        ], chunk)
+        self.stages = []
+
+    def record(self, distances, stage, left, right):
+        self.append(distances.timestamp, stage, distances.values, left, right)
+
+    def sensors(self, stage=None):
+        # label -> readings of all ticks, or only of ticks of given stage id
+        rows = self.rows()
+        if stage is not None:
+            rows = rows[rows['stage'] == stage]
+        return rows['time'], dict(zip(SENSORS, rows['sensors'].T))
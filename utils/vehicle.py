@@ -0,0 +1,301 @@
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.acquisition import Acquisition
+from utils.telemetry import SENSORS, Telemetry
+
+# seconds between sensor polls of acquisition thread
+ACQUISITION_INTERVAL = 0.005
+
+# readings are clamped to sensor range
+MAX_DISTANCE = 6
+
+# return code of commands that succeeded or were not sent as unchanged, simx_return_ok
+COMMAND_OK = 0
+
+
+class Distances:
+
+    # snapshot of all sensors, taken at timestamp and never changed afterwards; readings
+    # live in one read-only array in SENSORS order, attributes are views of its items
+
+    __slots__ = ('values', 'timestamp')
+
+    def __init__(self, values, timestamp=None):
+        values = np.minimum(np.asarray(values, dtype=float), MAX_DISTANCE)
+        values.flags.writeable = False
+        object.__setattr__(self, 'values', values)
+        object.__setattr__(self, 'timestamp', timestamp)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('distances are immutable')
+
+    def __reduce__(self):
+        # rebuilt through __init__, which __setattr__ blocks for pickle and copy
+        return Distances, (self.values, self.timestamp)
+
+    def __array__(self, dtype=None, copy=None):
+        # read-only values are shared by conversions unless copy is asked for
+        if dtype is None or self.values.dtype == dtype:
+            return self.values.copy() if copy else self.values
+        if copy is False:
+            raise ValueError(f'converting distances to {dtype} needs a copy')
+        return self.values.astype(dtype)
+
+    def __repr__(self):
+        return f'NW:{self.nw:.2f} NE:{self.ne:.2f} WN:{self.wn:.2f} EN:{self.en:.2f} | SW:{self.sw:.2f} SE:{self.se:.2f} WS:{self.ws:.2f} ES:{self.es:.2f}'
+
+
+def _sensor(index):
+    return property(lambda self: self.values[index])
+
+
+for _index, _name in enumerate(SENSORS):
+    setattr(Distances, _name, _sensor(_index))
+
+
+class Vehicle:
+
+    # driving, sensing and recording shared by tank in CoppeliaSim and by in-process
+    # simulator; subclasses set joint handles, send joint commands and read sensors
+
+    def __init__(self):
+        # last commanded force and velocity of every joint
+        self._forces = {}
+        self._velocities = {}
+        self.suppressed_commands = 0
+        self._batch_depth = 0
+
+        #initial velocity
+        self.leftvelocity=0
+        self.rightvelocity=0
+        self.MaxVel=10
+        self.dVel=1
+
+        self.telemetry = Telemetry()
+        self._acquisition = None
+
+    def start_acquisition(self, interval=ACQUISITION_INTERVAL):
+        # sensors are polled by background thread, read_distances takes newest snapshot
+        if self._acquisition is None:
+            self._acquisition = Acquisition(self._poll_distances, interval).start()
+
+    def stop_acquisition(self):
+        if self._acquisition is not None:
+            self._acquisition.stop()
+            self._acquisition = None
+
+    def close(self):
+        self.stop_acquisition()
+
+    def step(self):
+        pass
+
+    def time(self):
+        return time.time()
+
+    @contextmanager
+    def batch(self):
+        # commands issued inside go out in one packet and simulator applies them together;
+        # batches may nest, communication resumes when outermost one ends
+        if self._batch_depth == 0:
+            self._pause(True)
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._pause(False)
+
+    def _pause(self, enable):
+        pass
+
+    def _send_force(self, handle, force):
+        raise NotImplementedError('send force method not implemented')
+
+    def _send_velocity(self, handle, velocity):
+        raise NotImplementedError('send velocity method not implemented')
+
+    def stop(self):
+        with self.batch():
+            self._stop()
+
+    def _stop(self):
+        #set divers to stop mode
+        force =0
+        err_code = self._set_force(self.left_front_handle, force)
+        err_code = self._set_force(self.left_back_handle, force)
+        err_code = self._set_force(self.right_back_handle, force)
+        err_code = self._set_force(self.right_front_handle, force)
+        
+        force =10
+        for h in self.side_handles:
+            err_code = self._set_force(h, force)
+        
+        #break
+        self.leftvelocity=10
+        self.rightvelocity=10
+        self._set_velocity(self.left_front_handle, self.leftvelocity)
+        self._set_velocity(self.left_back_handle, self.leftvelocity)
+        self._set_velocity(self.right_back_handle, self.rightvelocity)
+        self._set_velocity(self.right_front_handle, self.rightvelocity)
+    
+    def _set_force(self, handle, force):
+        # joint commands are only sent when they change, simulator keeps the last one
+        if self._forces.get(handle) == force:
+            self.suppressed_commands += 1
+            return COMMAND_OK
+        self._forces[handle] = force
+        return self._send_force(handle, force)
+
+    def _set_velocity(self, handle, velocity):
+        if self._velocities.get(handle) == velocity:
+            self.suppressed_commands += 1
+            return COMMAND_OK
+        self._velocities[handle] = velocity
+        return self._send_velocity(handle, velocity)
+
+    def forget_commands(self):
+        # next commands are sent even if unchanged, e.g. after simulation restart
+        self._forces.clear()
+        self._velocities.clear()
+
+    def go(self):
+        with self.batch():
+            self._go()
+
+    def _go(self):
+        #set divers to go mode
+        force =10
+        err_code = self._set_force(self.left_front_handle, force)
+        err_code = self._set_force(self.left_back_handle, force)
+        err_code = self._set_force(self.right_back_handle, force)
+        err_code = self._set_force(self.right_front_handle, force)
+        
+        force =0
+        for h in self.side_handles:
+            err_code = self._set_force(h, force)
+    
+    def setVelocity(self):
+        #verify if the velocity is in correct range
+        if self.leftvelocity > self.MaxVel:
+            self.leftvelocity = self.MaxVel
+        if self.leftvelocity < -self.MaxVel:
+            self.leftvelocity = -self.MaxVel
+        if self.rightvelocity > self.MaxVel:
+            self.rightvelocity = self.MaxVel
+        if self.rightvelocity < -self.MaxVel:
+            self.rightvelocity = -self.MaxVel
+        
+        #send value of velocity to drivers
+        #vrep.simxSetJointTargetVelocity(clientID,left_front_handle,leftvelocity,vrep.simx_opmode_streaming)
+        self._set_velocity(self.left_back_handle, self.leftvelocity)
+        self._set_velocity(self.right_back_handle, self.rightvelocity)
+        #vrep.simxSetJointTargetVelocity(clientID,right_front_handle,rightvelocity,vrep.simx_opmode_streaming)
+    
+    #Move the tank forward
+    #None - increases velocity by 1, if velocities of wheels are different they are equalized 
+    #velocity - takes values from <-10,10> and sets them as velocity for both wheels in forward direction
+    def forward(self, velocity=None):
+        with self.batch():
+            self.go()
+            if velocity!=None:
+                self.leftvelocity=velocity
+                self.rightvelocity=velocity
+            else:
+                self.rightvelocity=self.leftvelocity=(self.leftvelocity+self.rightvelocity)/2
+                self.leftvelocity+=self.dVel
+                self.rightvelocity+=self.dVel
+            self.setVelocity()
+    
+    #Move the tank backward 
+    #None - decreases velocity by 1, if velocities of wheels are different they are equalized 
+    #velocity - takes values from <-10,10> and sets them as velocity for both wheels in backward direction
+    def backward(self, velocity=None):
+        with self.batch():
+            self.go()
+            if velocity!=None:
+                self.leftvelocity=-velocity
+                self.rightvelocity=-velocity
+            else:
+                self.rightvelocity=self.leftvelocity=(self.leftvelocity+self.rightvelocity)/2
+                self.leftvelocity-=self.dVel
+                self.rightvelocity-=self.dVel
+            self.setVelocity()
+    
+    #Turns left the tank 
+    #None - increases velocity of rightwheel by 1, decreases velocity of leftwheel by 1 
+    #velocity - takes values from <-10,10> and sets it as velocity for right wheel 
+        #in forward direction and oposite value of velocity for left wheel in backward direction
+    def turn_left(self, velocity=None):
+        with self.batch():
+            self.go()
+            if velocity!=None:
+                self.leftvelocity =-velocity
+                self.rightvelocity= velocity
+            else:
+                self.leftvelocity -=self.dVel
+                self.rightvelocity+=self.dVel
+            self.setVelocity()
+
+    def turn_left_circle(self, velocity):
+        with self.batch():
+            self.go()
+            self.leftvelocity = 10 * (velocity / 10)
+            self.rightvelocity = 3 * (velocity / 10)
+            self.setVelocity()
+
+
+    def turn_right_circle(self, velocity):
+        with self.batch():
+            self.go()
+            self.rightvelocity = 10 * (velocity / 10)
+            self.leftvelocity = 3 * (velocity / 10)
+            self.setVelocity()
+    
+    #Turns right the tank 
+    #None - increases velocity of leftwheel by 1, decreases velocity of rightwheel by 1 
+    #velocity - takes values from <-10,10> and sets it as velocity for left wheel 
+        #in forward direction and oposite value of velocity for right wheel in backward direction
+    def turn_right(self, velocity=None):
+        with self.batch():
+            self.go()
+            if velocity!=None:
+                self.leftvelocity = velocity
+                self.rightvelocity=-velocity
+            else:
+                self.leftvelocity +=self.dVel
+                self.rightvelocity-=self.dVel
+            self.setVelocity()
+
+    def read_distances(self):
+        if self._acquisition is not None:
+            return self._acquisition.slot.take()
+        return self._poll_distances()
+
+    def _poll_distances(self):
+        raise NotImplementedError('poll distances method not implemented')
+
+    def restart_plot(self):
+        self.telemetry.clear()
+
+    def plot_distances(self):
+        import matplotlib.pyplot as plt
+
+        time, sensors = self.telemetry.sensors()
+        x = time - time[0] if len(time) else time
+
+        plt.plot(x, sensors['nw'], '-', label='nw')
+        plt.plot(x, sensors['ne'], '-', label='ne')
+        plt.plot(x, sensors['wn'], '-', label='wn')
+        plt.plot(x, sensors['en'], '-', label='en')
+        plt.plot(x, sensors['sw'], '--', label='sw')
+        plt.plot(x, sensors['se'], '--', label='se')
+        plt.plot(x, sensors['ws'], '--', label='ws')
+        plt.plot(x, sensors['es'], '--', label='es')
+
+        plt.legend()
+        plt.show()